@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import copy
+import json
+from pathlib import Path
+from typing import Any, MutableMapping
+
+FIXTURES_PATH = Path("tests") / "fixtures"
+
+_RELATIONSHIP_TEST = {
+    "resource_type": "test",
+    "column_name": "customer_id",
+    "config": {"materialized": "test"},
+    "columns": {},
+    "tags": [],
+    "meta": {},
+}
+
+
+def scale_manifest(
+    target_dir: Path,
+    scale: int,
+    fixture: str = "manifest-v11.json",
+) -> Path:
+    """Writes a manifest.json with every node of a fixture repeated many times.
+
+    Each copy gets suffixed unique IDs and names, so relationships and refs still
+    resolve within the copy. An orders -> customers relationship test is added to
+    each copy when the fixture has the two models.
+
+    Args:
+        target_dir (Path): Directory to write manifest.json to.
+        scale (int): Number of copies.
+        fixture (str, optional): Fixture manifest to scale. Defaults to "manifest-v11.json".
+
+    Returns:
+        Path: Path to the scaled manifest.json.
+    """
+
+    with open(FIXTURES_PATH / fixture, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    nodes: dict[str, Any] = {}
+    child_map: dict[str, list[str]] = {}
+
+    for i in range(scale):
+        ids = {uid: f"{uid}_{i}" for uid in manifest["nodes"]}
+        names = {n["name"]: f"{n['name']}_{i}" for n in manifest["nodes"].values()}
+
+        for uid, node in manifest["nodes"].items():
+            new_node = copy.deepcopy(node)
+            new_node["unique_id"] = ids[uid]
+            if new_node.get("alias") == new_node["name"]:
+                new_node["alias"] = names[node["name"]]
+            new_node["name"] = names[node["name"]]
+            _rename_depends_on(new_node, ids, names)
+            nodes[ids[uid]] = new_node
+
+        for uid, children in manifest["child_map"].items():
+            if uid in ids:
+                child_map[ids[uid]] = [ids.get(c, c) for c in children]
+
+        customers = f"model.sandbox.customers_{i}"
+        orders = f"model.sandbox.orders_{i}"
+        if customers in nodes and orders in nodes:
+            test_id = f"test.sandbox.relationships_orders_customer_id_{i}"
+            nodes[test_id] = {
+                **copy.deepcopy(_RELATIONSHIP_TEST),
+                "unique_id": test_id,
+                "name": f"relationships_orders_customer_id_{i}",
+                "test_metadata": {
+                    "name": "relationships",
+                    "kwargs": {"to": f"ref('customers_{i}')", "field": "customer_id"},
+                },
+                "depends_on": {"macros": [], "nodes": [customers, orders]},
+                "refs": [{"name": f"customers_{i}"}, {"name": f"orders_{i}"}],
+            }
+            child_map[customers].append(test_id)
+            child_map[orders].append(test_id)
+            child_map[test_id] = []
+
+    manifest["nodes"] = nodes
+    manifest["child_map"] = child_map
+    manifest["parent_map"] = {}
+
+    target_dir.mkdir(parents=True, exist_ok=True)
+    path = target_dir / "manifest.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return path
+
+
+def _rename_depends_on(
+    node: MutableMapping[str, Any],
+    ids: dict[str, str],
+    names: dict[str, str],
+):
+    depends_on = node.get("depends_on", {})
+    depends_on["nodes"] = [ids.get(n, n) for n in depends_on.get("nodes", [])]
+
+    refs = []
+    for ref in node.get("refs", []):
+        if isinstance(ref, dict):
+            refs.append({**ref, "name": names.get(ref["name"], ref["name"])})
+        else:
+            refs.append([names.get(ref[0], ref[0]), *ref[1:]])
+    node["refs"] = refs
+
+
+def scale_metadata(scale: int) -> bytes:
+    """Builds a database metadata response with the fixture tables repeated.
+
+    Args:
+        scale (int): Number of copies of each table.
+
+    Returns:
+        bytes: Encoded metadata, as returned by Metabase.
+    """
+
+    with open(
+        FIXTURES_PATH / "api" / "database" / "2" / "metadata.json", encoding="utf-8"
+    ) as f:
+        metadata = json.load(f)
+
+    tables = []
+    for i in range(scale):
+        for table in metadata["tables"]:
+            table = copy.deepcopy(table)
+            table["name"] = f"{table['name']}_{i}"
+            tables.append(table)
+    metadata["tables"] = tables
+
+    return json.dumps(metadata).encode("utf-8")
@@ -0,0 +1,91 @@
+"""Field updates against a slow Metabase: sequential client vs. AsyncMetabase.
+
+Usage: python -m benchmarks.concurrency [--updates N] [--rtt MS] [--concurrency N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dbtmetabase.metabase import AsyncMetabase, Metabase
+
+
+def _serve(rtt: float) -> ThreadingHTTPServer:
+    """Starts a local API answering every request after a fixed delay."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_PUT(self):  # pylint: disable=invalid-name
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(rtt)
+
+            body = json.dumps({"id": self.path.rsplit("/", 1)[-1]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--updates", type=int, default=200)
+    parser.add_argument("--rtt", type=float, default=50, help="milliseconds")
+    parser.add_argument(
+        "--concurrency", type=int, default=AsyncMetabase.DEFAULT_CONCURRENCY
+    )
+    args = parser.parse_args()
+
+    server = _serve(args.rtt / 1000)
+    metabase = Metabase(
+        url=f"http://127.0.0.1:{server.server_port}",
+        api_key="benchmark",
+        username=None,
+        password=None,
+        session_id=None,
+        skip_verify=False,
+        cert=None,
+        http_timeout=15,
+        http_headers=None,
+        http_adapter=None,
+    )
+    body = {"description": "Benchmark"}
+
+    start = time.perf_counter()
+    for uid in range(args.updates):
+        metabase.update_field(uid=str(uid), body=body)
+    sequential_secs = time.perf_counter() - start
+
+    async_metabase = AsyncMetabase(metabase, concurrency=args.concurrency)
+    start = time.perf_counter()
+    async_metabase.run_all(
+        *(
+            async_metabase.update_field(uid=str(uid), body=body)
+            for uid in range(args.updates)
+        )
+    )
+    concurrent_secs = time.perf_counter() - start
+    async_metabase.close()
+    server.shutdown()
+
+    print(f"Updates: {args.updates}, RTT: {args.rtt:.0f} ms")
+    print(f"Sequential:              {sequential_secs:.2f} s")
+    print(f"Concurrent ({args.concurrency:>3} calls): {concurrent_secs:.2f} s")
+    print(f"Speedup:                 {sequential_secs / concurrent_secs:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Decoding database metadata responses: response.json() vs. codecs on raw bytes.
+
+Usage: python -m benchmarks.json_codec [--scale N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from dbtmetabase._json import ORJSON_CODEC, STDLIB_CODEC
+
+from ._fixtures import scale_metadata
+
+
+def _timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    content = scale_metadata(args.scale)
+    print(f"Payload: {len(content) / 1e6:.1f} MB")
+
+    # Equivalent of response.json(): decode to text first, then parse
+    text_secs = _timed(lambda: json.loads(content.decode("utf-8")), args.repeat)
+    print(f"{'response.json():':<24}{text_secs * 1000:.0f} ms")
+
+    for codec in filter(None, (STDLIB_CODEC, ORJSON_CODEC)):
+        secs = _timed(lambda: codec.loads(content), args.repeat)
+        print(f"{codec.name + ' (bytes):':<24}{secs * 1000:.0f} ms")
+        secs = _timed(lambda: codec.decode(content), args.repeat)
+        print(f"{codec.name + ' (bytes, no GC):':<24}{secs * 1000:.0f} ms")
+
+    if ORJSON_CODEC is None:
+        print("orjson not installed, pip install orjson to compare")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Peak RSS and retained memory of Manifest.read_models on a synthetic large manifest.
+
+Usage: python -m benchmarks.memory [--scale N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from dbtmetabase.manifest import Manifest
+
+from ._fixtures import scale_manifest
+
+
+def _measure(target_dir: str, stream: bool) -> dict:
+    """Reads models in this process and reports its memory usage."""
+
+    tracemalloc.start()
+    manifest = Manifest(target_dir, stream=stream)
+    models = manifest.read_models()
+    del manifest
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "models": len(models),
+        "columns": sum(len(m.columns) for m in models),
+        # Kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "retained_mb": retained / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=500)
+    parser.add_argument("--child", nargs=2, metavar=("TARGET_DIR", "STREAM"))
+    args = parser.parse_args()
+
+    if args.child:
+        target_dir, stream = args.child
+        print(json.dumps(_measure(target_dir, stream=stream == "stream")))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = scale_manifest(Path(tmp), scale=args.scale)
+        print(f"Manifest: {path.stat().st_size / 1024 / 1024:.1f} MB")
+
+        for mode in ("load", "stream"):
+            # Fresh process per mode, so peak RSS is not shared
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.memory", "--child", tmp, mode],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.splitlines()[-1])
+            print(
+                f"{mode:>6}: {result['models']} models, {result['columns']} columns, "
+                f"peak RSS {result['peak_rss_mb']:.1f} MB, "
+                f"retained {result['retained_mb']:.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
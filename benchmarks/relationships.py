@@ -0,0 +1,83 @@
+"""Relationship resolution: per-model child_map scans vs. precomputed index.
+
+Usage: python -m benchmarks.relationships [--scale N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Mapping
+
+from dbtmetabase.manifest import Manifest
+
+from ._fixtures import scale_manifest
+
+
+def _scan_child_map(manifest: Manifest) -> dict[str, dict[str, dict[str, str]]]:
+    """Previous approach, walking child_map of every model."""
+
+    raw = manifest._load()  # pylint: disable=protected-access
+    nodes: Mapping = raw["nodes"]
+
+    relationships = {}
+    for unique_id, node in nodes.items():
+        if node["resource_type"] != "model":
+            continue
+
+        model_relationships = {}
+        for child_id in raw["child_map"][unique_id]:
+            # pylint: disable=protected-access
+            relationship = manifest._read_relationship(
+                child=nodes.get(child_id, {}),
+                unique_id=unique_id,
+                nodes=nodes,
+            )
+            if relationship:
+                column_name, fk_target = relationship
+                model_relationships[column_name] = fk_target
+
+        if model_relationships:
+            relationships[unique_id] = model_relationships
+
+    return relationships
+
+
+def _timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scale_manifest(Path(tmp), scale=args.scale)
+        manifest = Manifest(tmp)
+        nodes = manifest._load()["nodes"]  # pylint: disable=protected-access
+
+        # pylint: disable=protected-access
+        indexed = manifest._read_relationships()
+        if indexed != _scan_child_map(manifest):
+            raise AssertionError("Index differs from child_map scan")
+
+        scan_secs = _timed(lambda: _scan_child_map(manifest), args.repeat)
+        index_secs = _timed(manifest._read_relationships, args.repeat)
+
+    print(f"Nodes: {len(nodes)}, relationships: {sum(map(len, indexed.values()))}")
+    print(f"child_map scan: {scan_secs * 1000:.1f} ms")
+    print(f"Index:          {index_secs * 1000:.1f} ms")
+    print(f"Speedup:        {scan_secs / index_secs:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
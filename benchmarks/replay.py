@@ -0,0 +1,77 @@
+"""Commands against recorded Metabase traffic, with simulated latency and errors.
+
+Record a cassette by running any command with --http-record PATH against a live
+Metabase, then replay it here without one.
+
+Usage: python -m benchmarks.replay CASSETTE {models,exposures,dash} [--latency MS]
+       [--jitter MS] [--error-rate RATE] [--target-path PATH] [--metabase-database NAME]
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import tempfile
+import time
+
+from dbtmetabase._transport import ReplayAdapter
+from dbtmetabase.core import DbtMetabase
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cassette")
+    parser.add_argument("command", choices=("models", "exposures", "dash"))
+    parser.add_argument("--latency", type=float, default=50, help="milliseconds")
+    parser.add_argument("--jitter", type=float, default=10, help="milliseconds")
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--target-path", default=DbtMetabase.TARGET_DIR)
+    parser.add_argument("--metabase-database")
+    parser.add_argument("--profile", metavar="PATH", help="write cProfile stats")
+    args = parser.parse_args()
+    if args.command == "models" and not args.metabase_database:
+        parser.error("--metabase-database is required for models")
+
+    adapter = ReplayAdapter(
+        args.cassette,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    # Cassettes are keyed by path, so any URL and credentials replay them
+    core = DbtMetabase(
+        metabase_url="http://localhost",
+        metabase_api_key="replay",
+        http_adapter=adapter,
+        target_dir=args.target_path,
+    )
+
+    def run():
+        if args.command == "models":
+            core.export_models(metabase_database=args.metabase_database)
+        elif args.command == "exposures":
+            with tempfile.TemporaryDirectory() as output_path:
+                core.extract_exposures(
+                    output_path=output_path,
+                    metabase_database=args.metabase_database,
+                )
+        else:
+            core.update_dashbords(metabase_database=args.metabase_database)
+
+    profiler = cProfile.Profile() if args.profile else None
+    start = time.perf_counter()
+    if profiler:
+        profiler.runcall(run)
+        profiler.dump_stats(args.profile)
+    else:
+        run()
+    secs = time.perf_counter() - start
+
+    print(f"Command: {args.command}, latency: {args.latency:.0f}±{args.jitter:.0f} ms")
+    print(f"Elapsed: {secs:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ import yaml
 
 from .core import DbtMetabase
 from .format import Filter, setup_logging
+from .metabase import AsyncMetabase
 
 
 def _click_list_option_kwargs() -> Mapping[str, Any]:
@@ -86,6 +87,28 @@ def _add_setup(func: Callable) -> Callable:
         type=click.Path(exists=True, file_okay=False),
         help="Path to dbt target directory. it generated after compilation",
     )
+    @click.option(
+        "--stream-manifest",
+        envvar="STREAM_MANIFEST",
+        show_envvar=True,
+        is_flag=True,
+        help="Read manifest.json incrementally to bound memory on large projects.",
+    )
+    @click.option(
+        "--manifest-cache/--no-manifest-cache",
+        envvar="MANIFEST_CACHE",
+        show_envvar=True,
+        default=False,
+        show_default=True,
+        help="Persist parsed manifest under target directory between runs, as pickle files loaded on later runs, so only for target directories you trust.",
+    )
+    @click.option(
+        "--clear-manifest-cache",
+        envvar="CLEAR_MANIFEST_CACHE",
+        show_envvar=True,
+        is_flag=True,
+        help="Remove persisted manifest before running.",
+    )
     @click.option(
         "--metabase-url",
         metavar="URL",
@@ -119,6 +142,13 @@ def _add_setup(func: Callable) -> Callable:
         type=click.STRING,
         help="Metabase password (required unless providing API key).",
     )
+    @click.option(
+        "--metabase-session-cache",
+        envvar="METABASE_SESSION_CACHE",
+        show_envvar=True,
+        is_flag=True,
+        help="Reuse sessions from username/password logins between runs, stored in ~/.dbt-metabase/sessions.json.",
+    )
     @click.option(
         "--metabase-session-id",
         metavar="TOKEN",
@@ -152,6 +182,55 @@ def _add_setup(func: Callable) -> Callable:
         show_default=True,
         help="HTTP timeout in seconds.",
     )
+    @click.option(
+        "--http-concurrency",
+        metavar="CALLS",
+        envvar="HTTP_CONCURRENCY",
+        show_envvar=True,
+        type=click.IntRange(min=1),
+        default=AsyncMetabase.DEFAULT_CONCURRENCY,
+        show_default=True,
+        help="Maximum number of Metabase API calls in flight when issued concurrently.",
+    )
+    @click.option(
+        "--http-rate-limit",
+        metavar="CALLS",
+        envvar="HTTP_RATE_LIMIT",
+        show_envvar=True,
+        type=click.FloatRange(min=0, min_open=True),
+        help="Maximum Metabase API calls per second, on top of concurrency adapting to throttling by the server.",
+    )
+    @click.option(
+        "--http-pool-size",
+        metavar="CONNECTIONS",
+        envvar="HTTP_POOL_SIZE",
+        show_envvar=True,
+        type=click.IntRange(min=1),
+        help="Number of connections to Metabase kept alive, derived from HTTP concurrency by default.",
+    )
+    @click.option(
+        "--http-pool-block",
+        envvar="HTTP_POOL_BLOCK",
+        show_envvar=True,
+        is_flag=True,
+        help="Never open more connections to Metabase than the pool size.",
+    )
+    @click.option(
+        "--http-compression",
+        envvar="HTTP_COMPRESSION",
+        show_envvar=True,
+        is_flag=True,
+        help="Compress large request bodies with gzip, if Metabase or a proxy in front of it accepts them.",
+    )
+    @click.option(
+        "--http-record",
+        "http_record_path",
+        metavar="PATH",
+        envvar="HTTP_RECORD_PATH",
+        show_envvar=True,
+        type=click.Path(file_okay=False),
+        help="Record Metabase API responses to a directory, for replaying in benchmarks.",
+    )
     @click.option(
         "--http-header",
         "http_headers",
@@ -168,14 +247,24 @@ def _add_setup(func: Callable) -> Callable:
     @functools.wraps(func)
     def wrapper(
         target_path: str,
+        stream_manifest: bool,
+        manifest_cache: bool,
+        clear_manifest_cache: bool,
         metabase_url: str,
         metabase_api_key: str,
         metabase_username: str,
         metabase_password: str,
+        metabase_session_cache: bool,
         metabase_session_id: Optional[str],
         skip_verify: bool,
         cert: Optional[str],
         http_timeout: int,
+        http_concurrency: int,
+        http_rate_limit: Optional[float],
+        http_pool_size: Optional[int],
+        http_pool_block: bool,
+        http_compression: bool,
+        http_record_path: Optional[str],
         http_headers: Sequence[Tuple[str, str]],
         verbose: bool,
         **kwargs,
@@ -185,22 +274,33 @@ def _add_setup(func: Callable) -> Callable:
             path=Path.home().absolute() / ".dbt-metabase" / "logs" / "dbtmetabase.log",
         )
 
-        return func(
-            core=DbtMetabase(
-                target_dir=target_path,
-                metabase_url=metabase_url,
-                metabase_api_key=metabase_api_key,
-                metabase_username=metabase_username,
-                metabase_password=metabase_password,
-                metabase_session_id=metabase_session_id,
-                skip_verify=skip_verify,
-                cert=cert,
-                http_timeout=http_timeout,
-                http_headers={k: v for k, v in http_headers},
-            ),
-            **kwargs,
+        core = DbtMetabase(
+            target_dir=target_path,
+            stream_manifest=stream_manifest,
+            manifest_cache=manifest_cache,
+            metabase_url=metabase_url,
+            metabase_api_key=metabase_api_key,
+            metabase_username=metabase_username,
+            metabase_password=metabase_password,
+            metabase_session_id=metabase_session_id,
+            metabase_session_cache=metabase_session_cache,
+            skip_verify=skip_verify,
+            cert=cert,
+            http_timeout=http_timeout,
+            http_headers={k: v for k, v in http_headers},
+            http_concurrency=http_concurrency,
+            http_rate_limit=http_rate_limit,
+            http_pool_size=http_pool_size,
+            http_pool_block=http_pool_block,
+            http_compression=http_compression,
+            http_record_path=http_record_path,
         )
 
+        if clear_manifest_cache:
+            core.manifest.clear_cache()
+
+        return func(core=core, **kwargs)
+
     return wrapper
 
 
@@ -301,6 +401,65 @@ def _add_setup(func: Callable) -> Callable:
     is_flag=True,
     help="Preserve column order in dbt project.",
 )
+@click.option(
+    "--state",
+    "state_path",
+    metavar="PATH",
+    envvar="STATE_PATH",
+    show_envvar=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="Path to dbt target directory from a previous run, to only export models and columns modified since.",
+)
+@click.option(
+    "--use-catalog",
+    envvar="USE_CATALOG",
+    show_envvar=True,
+    is_flag=True,
+    help="Read physical columns from catalog.json in dbt target directory, to wait for and order all columns rather than only documented ones.",
+)
+@click.option(
+    "--workers",
+    metavar="N",
+    envvar="WORKERS",
+    show_envvar=True,
+    type=click.IntRange(min=1),
+    default=DbtMetabase.DEFAULT_MODELS_WORKERS,
+    show_default=True,
+    help="Number of updates applied to Metabase concurrently, capped by HTTP concurrency.",
+)
+@click.option(
+    "--force-sync",
+    envvar="FORCE_SYNC",
+    show_envvar=True,
+    is_flag=True,
+    help="Sync schema of the whole Metabase database even if all tables and columns are already there.",
+)
+@click.option(
+    "--fingerprints",
+    "fingerprints_path",
+    metavar="PATH",
+    envvar="FINGERPRINTS_PATH",
+    show_envvar=True,
+    type=click.Path(dir_okay=False),
+    help="Path to file with fingerprints of models exported before, created if missing, to only export models and columns changed since.",
+)
+@click.option(
+    "--reconcile-interval",
+    metavar="DAYS",
+    envvar="RECONCILE_INTERVAL",
+    show_envvar=True,
+    type=click.IntRange(min=0),
+    default=DbtMetabase.DEFAULT_MODELS_RECONCILE_INTERVAL,
+    show_default=True,
+    help="Number of days after which each model is exported as a whole regardless of fingerprints, to revert changes made in Metabase.",
+)
+@click.option(
+    "--full-reconcile",
+    envvar="FULL_RECONCILE",
+    show_envvar=True,
+    is_flag=True,
+    help="Export all models regardless of fingerprints.",
+)
 def models(
     metabase_database: str,
     include_databases: Optional[Sequence[str]],
@@ -314,6 +473,13 @@ def models(
     append_tags: bool,
     docs_url: Optional[str],
     order_fields: bool,
+    state_path: Optional[str],
+    use_catalog: bool,
+    workers: int,
+    force_sync: bool,
+    fingerprints_path: Optional[str],
+    reconcile_interval: int,
+    full_reconcile: bool,
     core: DbtMetabase,
 ):
     core.export_models(
@@ -326,6 +492,13 @@ def models(
         append_tags=append_tags,
         docs_url=docs_url,
         order_fields=order_fields,
+        state_path=state_path,
+        use_catalog=use_catalog,
+        workers=workers,
+        force_sync=force_sync,
+        fingerprints_path=fingerprints_path,
+        reconcile_interval=reconcile_interval,
+        full_reconcile=full_reconcile,
     )
 
 
@@ -377,6 +550,14 @@ def models(
     is_flag=True,
     help="Exclude items that have not been verified. Only applies to entity types that support verification.",
 )
+@click.option(
+    "--tables-database",
+    metavar="DATABASE",
+    envvar="TABLES_DATABASE",
+    show_envvar=True,
+    type=click.STRING,
+    help="Only resolve tables of this Metabase database, ignoring questions on other databases. Defaults to all databases.",
+)
 def exposures(
     output_path: str,
     output_grouping: Optional[str],
@@ -384,6 +565,7 @@ def exposures(
     exclude_collections: Optional[Sequence[str]],
     allow_personal_collections: bool,
     exclude_unverified: bool,
+    tables_database: Optional[str],
     core: DbtMetabase,
 ):
     core.extract_exposures(
@@ -395,6 +577,7 @@ def exposures(
         ),
         allow_personal_collections=allow_personal_collections,
         exclude_unverified=exclude_unverified,
+        metabase_database=tables_database,
     )
 
 
@@ -416,8 +599,25 @@ def exposures(
     default=DbtMetabase.MODELS_PREFIX,
     help="prefix that will be removed from dbt model name before publish to metabase",
 )
-def dash(collection: str, models_prefix: str, core: DbtMetabase):
-    core.update_dashbords(collection=collection, models_prefix=models_prefix)
+@click.option(
+    "--tables-database",
+    metavar="DATABASE",
+    envvar="TABLES_DATABASE",
+    show_envvar=True,
+    type=click.STRING,
+    help="Database in Metabase with the dashboard models, to only load its tables. Defaults to all databases.",
+)
+def dash(
+    collection: str,
+    models_prefix: str,
+    tables_database: Optional[str],
+    core: DbtMetabase,
+):
+    core.update_dashbords(
+        collection=collection,
+        models_prefix=models_prefix,
+        metabase_database=tables_database,
+    )
 
 
 if __name__ == "__main__":
@@ -7,7 +7,7 @@ from typing import Any, Optional, Iterator, Literal
 from .errors import MetabaseStateError
 from .format import Filter, NullValue, safe_name
 from .manifest import Manifest, DashFilter, Dashboard, Card
-from .metabase import Metabase
+from .metabase import AsyncMetabase, Metabase
 
 _logger = logging.getLogger(__name__)
 
@@ -93,16 +93,34 @@ class CardsCreator(metaclass=ABCMeta):
     def metabase(self) -> Metabase:
         pass
 
+    @property
+    @abstractmethod
+    def async_metabase(self) -> AsyncMetabase:
+        pass
+
     def update_dashbords(
-        self, collection: str = COLLECTION, models_prefix: str = MODELS_PREFIX
+        self,
+        collection: str = COLLECTION,
+        models_prefix: str = MODELS_PREFIX,
+        metabase_database: Optional[str] = None,
     ):
         user_id = self.metabase.get_current_user()["id"]
         dashboards = self.manifest.read_dashboards()
         dbt_clt = self.__create_collection(collection)
+
+        # Tables are listed once for all dashboards, only for the target database if given
+        database_id = None
+        if metabase_database:
+            database = self.metabase.find_database(name=metabase_database)
+            if not database:
+                raise MetabaseStateError(f"Database not found: {metabase_database}")
+            database_id = database["id"]
+        tables = self.metabase.get_tables(database_id=database_id)
+
         for dash in dashboards:
             _logger.debug(f"Processing dashboard {dash.name}")
             dash_clt = self.__create_collection(dash.name, dbt_clt)
-            self.__enrich_filters(dash)
+            self.__enrich_filters(dash, tables)
             for card in dash.cards.values():
                 _logger.debug(f"Processing card {card.name}")
                 card.name = card.name.removeprefix(models_prefix)
@@ -147,26 +165,46 @@ class CardsCreator(metaclass=ABCMeta):
             )
         return int(cl_id)
 
-    def __enrich_filters(self, dash: Dashboard) -> dict[str, DashFilter]:
+    def __enrich_filters(
+        self, dash: Dashboard, tables: list[dict]
+    ) -> dict[str, DashFilter]:
         filters = dash.filters
-        tables = self.metabase.get_tables()
 
         # Debug logs with concise, relevant information
         _logger.debug(f"Dashboard '{dash.name}' contains {len(filters)} filters.")
-        # Enrich filters with additional metadata
+
+        # Locate the tables that correspond to the model names of the filters
+        filter_tables = {}
         for fname, filter in filters.items():
-            _logger.debug(f"Enriching filter {fname} on model '{filter.model_name}' and column '{filter.column_name}'")
-            # Locate the table that corresponds to the model name of the filter
             try:
-                table = next(t for t in tables if t["name"] == filter.model_name)
+                filter_tables[fname] = next(
+                    t for t in tables if t["name"] == filter.model_name
+                )
             except StopIteration:
                 _logger.error(f"Table with name '{filter.model_name}' not found")
+
+        # Columns of each table are fetched once, concurrently
+        table_ids = list(dict.fromkeys(t["id"] for t in filter_tables.values()))
+        table_columns = dict(
+            zip(
+                table_ids,
+                self.async_metabase.run_all(
+                    *(self.async_metabase.get_columns(t) for t in table_ids)
+                ),
+            )
+        )
+
+        # Enrich filters with additional metadata
+        for fname, filter in filters.items():
+            _logger.debug(f"Enriching filter {fname} on model '{filter.model_name}' and column '{filter.column_name}'")
+            table = filter_tables.get(fname)
+            if table is None:
                 continue
 
             filter.db_id = table["db_id"]
 
             try:
-                columns = self.metabase.get_columns(table["id"])
+                columns = table_columns[table["id"]]
                 column = next(c for c in columns if c["name"] == filter.column_name)
             except StopIteration:
                 _logger.error(f"Column with name '{filter.column_name}' not found in table '{filter.model_name}'")
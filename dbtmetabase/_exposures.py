@@ -1,16 +1,27 @@
 from __future__ import annotations
 
 import dataclasses as dc
+import itertools
 import logging
 import re
 from abc import ABCMeta, abstractmethod
 from operator import itemgetter
 from pathlib import Path
-from typing import Iterable, Mapping, MutableMapping, MutableSequence, Optional, Tuple
+from typing import (
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Optional,
+    Tuple,
+)
+
+import requests
 
-from dbtmetabase.metabase import Metabase
+from dbtmetabase.metabase import AsyncMetabase, Metabase
 
-from .errors import ArgumentError
+from .errors import ArgumentError, MetabaseStateError
 from .format import Filter, dump_yaml, safe_description, safe_name
 from .manifest import Manifest
 
@@ -30,6 +41,9 @@ class ExposuresMixin(metaclass=ABCMeta):
 
     DEFAULT_EXPOSURES_OUTPUT_PATH = "."
 
+    # Collection items whose entities are fetched concurrently at a time
+    __ITEMS_BATCH_SIZE = 100
+
     @property
     @abstractmethod
     def manifest(self) -> Manifest:
@@ -40,6 +54,11 @@ class ExposuresMixin(metaclass=ABCMeta):
     def metabase(self) -> Metabase:
         pass
 
+    @property
+    @abstractmethod
+    def async_metabase(self) -> AsyncMetabase:
+        pass
+
     def extract_exposures(
         self,
         output_path: str = DEFAULT_EXPOSURES_OUTPUT_PATH,
@@ -47,6 +66,7 @@ class ExposuresMixin(metaclass=ABCMeta):
         collection_filter: Optional[Filter] = None,
         allow_personal_collections: bool = False,
         exclude_unverified: bool = False,
+        metabase_database: Optional[str] = None,
     ) -> Iterable[Mapping]:
         """Extract dbt exposures from Metabase.
 
@@ -56,6 +76,7 @@ class ExposuresMixin(metaclass=ABCMeta):
             collection_filter (Optional[Filter], optional): Filter Metabase collections. Defaults to None.
             allow_personal_collections (bool, optional): Allow personal Metabase collections. Defaults to False.
             exclude_unverified (bool, optional): Exclude items that have not been verified. Only applies to entity types that support verification. Defaults to False.
+            metabase_database (Optional[str], optional): Only resolve tables of this Metabase database, instead of loading tables of all databases. Defaults to None.
 
         Returns:
             Iterable[Mapping]: List of parsed exposures.
@@ -66,11 +87,20 @@ class ExposuresMixin(metaclass=ABCMeta):
 
         collection_filter = collection_filter or Filter()
 
-        models = self.manifest.read_models()
+        database_id = None
+        if metabase_database:
+            database = self.metabase.find_database(name=metabase_database)
+            if not database:
+                raise MetabaseStateError(f"Database not found: {metabase_database}")
+            database_id = database["id"]
 
         ctx = self.__Context(
-            model_refs={m.name: m.ref for m in models if m.ref},
-            table_names={t["id"]: t["name"] for t in self.metabase.get_tables()},
+            model_refs=self.manifest.read_refs(),
+            table_names={
+                t["id"]: t["name"]
+                for t in self.metabase.get_tables(database_id=database_id)
+            },
+            database_id=database_id,
         )
 
         exposures = []
@@ -87,25 +117,17 @@ class ExposuresMixin(metaclass=ABCMeta):
                 continue
 
             _logger.info("Exploring collection '%s'", collection["name"])
-            for item in self.metabase.get_collection_items(
-                uid=collection["id"],
-                models=("card", "dashboard"),
+            for item, item_entity in self.__iter_item_entities(
+                collection_id=collection["id"],
+                exclude_unverified=exclude_unverified,
             ):
-                if (
-                    exclude_unverified
-                    and item["model"] == "card"
-                    and item.get("moderated_status") != "verified"
-                ):
-                    _logger.debug("Skipping unverified card '%s'", item["name"])
-                    continue
-
                 depends = set()
                 native_query = ""
                 header = ""
 
                 entity: Mapping
                 if item["model"] == "card":
-                    card_entity = self.metabase.find_card(uid=item["id"])
+                    card_entity = item_entity
                     if card_entity is None:
                         _logger.info("Card '%s' not found, skipping", item["id"])
                         continue
@@ -120,7 +142,7 @@ class ExposuresMixin(metaclass=ABCMeta):
                     native_query = result["native_query"]
 
                 elif item["model"] == "dashboard":
-                    dashboard_entity = self.metabase.find_dashboard(uid=item["id"])
+                    dashboard_entity = item_entity
                     if dashboard_entity is None:
                         _logger.info("Dashboard '%s' not found, skipping", item["id"])
                         continue
@@ -194,6 +216,48 @@ class ExposuresMixin(metaclass=ABCMeta):
 
         return exposures
 
+    def __iter_item_entities(
+        self,
+        collection_id: str,
+        exclude_unverified: bool,
+    ) -> Iterator[Tuple[Mapping, Optional[Mapping]]]:
+        """Streams collection items with their cards or dashboards.
+
+        Entities are fetched concurrently in batches, while later pages of items load
+        in the background, and yielded in collection order.
+        """
+
+        items = self.metabase.iter_collection_items(
+            uid=collection_id,
+            models=["card", "dashboard"],
+        )
+        if exclude_unverified:
+            items = filter(self.__is_verified, items)
+
+        while batch := list(itertools.islice(items, self.__ITEMS_BATCH_SIZE)):
+            yield from zip(
+                batch,
+                self.async_metabase.run_all(
+                    *(self.__find_item_entity(item) for item in batch)
+                ),
+            )
+
+    @staticmethod
+    def __is_verified(item: Mapping) -> bool:
+        if item["model"] == "card" and item.get("moderated_status") != "verified":
+            _logger.debug("Skipping unverified card '%s'", item["name"])
+            return False
+        return True
+
+    async def __find_item_entity(self, item: Mapping) -> Optional[Mapping]:
+        """Retrieves the card or dashboard behind a collection item."""
+
+        if item["model"] == "card":
+            return await self.async_metabase.find_card(uid=item["id"])
+        if item["model"] == "dashboard":
+            return await self.async_metabase.find_dashboard(uid=item["id"])
+        return None
+
     def __extract_card_exposures(
         self,
         ctx: __Context,
@@ -222,9 +286,9 @@ class ExposuresMixin(metaclass=ABCMeta):
                             ),
                         )["depends"]
                     )
-                elif query_source in ctx.table_names:
+                elif query_source is not None:
                     # Normal question
-                    source_table = ctx.table_names.get(query_source)
+                    source_table = self.__table_name(ctx, query_source)
                     if source_table:
                         source_table = source_table.lower()
                         _logger.info("Extracted model '%s' from card", source_table)
@@ -247,7 +311,7 @@ class ExposuresMixin(metaclass=ABCMeta):
                         continue
 
                     # Joined model parsed
-                    joined_table = ctx.table_names.get(join_source)
+                    joined_table = self.__table_name(ctx, join_source)
                     if joined_table:
                         joined_table = joined_table.lower()
                         _logger.info("Extracted model '%s' from join", joined_table)
@@ -286,6 +350,27 @@ class ExposuresMixin(metaclass=ABCMeta):
             "native_query": native_query,
         }
 
+    def __table_name(self, ctx: __Context, table_id) -> Optional[str]:
+        """Resolves table name by ID, looking up tables missing from the listing.
+
+        Only applies to listings of one database, where tables may have been added
+        since. Tables of other databases are ignored.
+        """
+
+        if table_id in ctx.table_names or ctx.database_id is None:
+            return ctx.table_names.get(table_id)
+
+        try:
+            table = self.metabase.find_table(uid=table_id)
+        except requests.exceptions.HTTPError as e:
+            # Skipped like tables missing from the listing, e.g. without permissions
+            _logger.warning("Unable to look up table '%s': %s", table_id, e)
+            table = None
+
+        name = table["name"] if table and table["db_id"] == ctx.database_id else None
+        ctx.table_names[table_id] = name
+        return name
+
     def __format_exposure(
         self,
         model: str,
@@ -389,4 +474,5 @@ class ExposuresMixin(metaclass=ABCMeta):
     @dc.dataclass
     class __Context:
         model_refs: Mapping[str, str]
-        table_names: Mapping[str, str]
+        table_names: MutableMapping[str, Optional[str]]
+        database_id: Optional[str] = None
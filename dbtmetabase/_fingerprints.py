@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Union
+
+from ._json import read_json_file, write_json_file
+from .format import NullValue
+
+
+def fingerprint(*values: Any) -> str:
+    """Short digest of JSON-serializable values, telling explicit nulls from empty strings."""
+
+    payload = json.dumps(
+        [{"null": True} if v is NullValue else v for v in values],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class FingerprintStore:
+    """Fingerprints of models last exported to Metabase, keyed by URL and database.
+
+    Each database holds, by model unique ID, fingerprints of its table and fields and
+    the time it was last exported as a whole. Fingerprints carry nothing but digests.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path).expanduser()
+
+    def get(self, url: str, database_id: str) -> dict[str, Any]:
+        """Returns stored state of a database, empty if never exported."""
+
+        state = self._read().get(self._key(url, database_id))
+        return state if isinstance(state, dict) else {}
+
+    def set(self, url: str, database_id: str, state: dict[str, Any]):
+        """Stores state of a database, leaving other databases as they are."""
+
+        states = self._read()
+        states[self._key(url, database_id)] = state
+        self._write(states)
+
+    @staticmethod
+    def _key(url: str, database_id: str) -> str:
+        return f"{url}/api/database/{database_id}"
+
+    def _read(self) -> dict[str, Any]:
+        return read_json_file(self.path, "fingerprints")
+
+    def _write(self, states: dict[str, Any]):
+        write_json_file(self.path, states, "fingerprints")
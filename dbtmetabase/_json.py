@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import dataclasses as dc
+import gc
+import json
+import logging
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Collection, Iterator, Optional, TextIO, Tuple, Union
+
+_logger = logging.getLogger(__name__)
+
+# Default number of characters read from the file at a time
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# Payload size from which garbage collection is paused while decoding
+GC_PAUSE_THRESHOLD = 1 << 20
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER = re.compile(r"[-+0-9.eE]*")
+_DECODER = json.JSONDecoder()
+
+
+class _StreamReader:
+    """Incremental reader for a JSON document that never holds more than one value in memory."""
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Reads more data into the buffer, dropping what has already been consumed."""
+
+        if self._eof:
+            return False
+
+        # Grow reads geometrically, so large values don't get re-decoded too many times
+        chunk = self._f.read(max(self._chunk_size, len(self._buf) - self._pos))
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            match = _WHITESPACE.match(self._buf, self._pos)
+            self._pos = match.end() if match else self._pos
+            if self._pos < len(self._buf) or not self._fill():
+                return
+
+    def peek(self) -> str:
+        self._skip_whitespace()
+        if self._pos >= len(self._buf):
+            raise json.JSONDecodeError(
+                "Unexpected end of document", self._buf, self._pos
+            )
+        return self._buf[self._pos]
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._buf, self._pos)
+        self._pos += 1
+
+    def value(self) -> Any:
+        self._skip_whitespace()
+
+        # Numbers cut off by the end of the buffer decode as a shorter one, e.g. "1."
+        while self._pos < len(self._buf) and self._buf[self._pos] in "-0123456789":
+            match = _NUMBER.match(self._buf, self._pos)
+            if (match and match.end() < len(self._buf)) or not self._fill():
+                break
+
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # Value is likely cut off by the end of the buffer
+                if not self._fill():
+                    raise
+                continue
+
+            # Scalars ending exactly at the buffer boundary (e.g. numbers) may be truncated
+            if end < len(self._buf) or not self._fill():
+                self._pos = end
+                return value
+
+    def keys(self) -> Iterator[str]:
+        """Iterates over keys of an object, caller must consume each value before advancing."""
+
+        self.expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError(
+                    "Expecting property name", self._buf, self._pos
+                )
+            self.expect(":")
+
+            yield key
+
+            if self.peek() == ",":
+                self._pos += 1
+                continue
+            self.expect("}")
+            return
+
+
+def iter_sections(
+    f: TextIO,
+    sections: Collection[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Tuple[str, str, Any]]:
+    """Streams entries of selected top-level objects in a JSON document.
+
+    Only one entry is decoded at a time, so memory is bounded by the largest entry
+    rather than the whole document. Entries of other sections are decoded and discarded.
+
+    Args:
+        f (TextIO): Open text file handle.
+        sections (Collection[str]): Top-level keys to yield entries for, e.g. "nodes".
+        chunk_size (int, optional): Number of characters to read at a time. Defaults to 1 MiB.
+
+    Yields:
+        Iterator[Tuple[str, str, Any]]: Section name, entry key and decoded entry value.
+    """
+
+    reader = _StreamReader(f, chunk_size)
+    for section in reader.keys():
+        if reader.peek() != "{":
+            reader.value()
+            continue
+
+        for key in reader.keys():
+            value = reader.value()
+            if section in sections:
+                yield section, key, value
+
+
+@dc.dataclass(frozen=True)
+class JSONCodec:
+    """Encoder and decoder for JSON payloads exchanged with Metabase.
+
+    Decoders accept raw bytes, so responses are decoded without an intermediate text copy.
+    """
+
+    name: str
+    loads: Callable[[Union[bytes, str]], Any]
+    dumps: Callable[[Any], bytes]
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        """Decodes a payload, pausing cyclic garbage collection for large ones.
+
+        Decoding allocates enough containers to trigger repeated collections, which can
+        take longer than the decoding itself, yet decoded JSON never contains cycles.
+        """
+
+        if len(data) < GC_PAUSE_THRESHOLD or not gc.isenabled():
+            return self.loads(data)
+
+        gc.disable()
+        try:
+            return self.loads(data)
+        finally:
+            gc.enable()
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj).encode("utf-8")
+
+
+STDLIB_CODEC = JSONCodec(name="json", loads=json.loads, dumps=_stdlib_dumps)
+
+try:
+    import orjson  # type: ignore
+
+    ORJSON_CODEC: Optional[JSONCodec] = JSONCodec(
+        name="orjson",
+        loads=orjson.loads,  # pylint: disable=no-member
+        dumps=orjson.dumps,  # pylint: disable=no-member
+    )
+except ModuleNotFoundError:
+    ORJSON_CODEC = None
+
+
+def default_codec() -> JSONCodec:
+    """Fastest codec available, orjson when installed or the standard library otherwise."""
+    return ORJSON_CODEC or STDLIB_CODEC
+
+
+def read_json_file(path: Path, label: str) -> dict[str, Any]:
+    """Reads a JSON object from file, empty when missing or unreadable.
+
+    Args:
+        path (Path): File to read.
+        label (str): What the file holds, for warnings.
+    """
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            obj = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        _logger.warning("Ignoring unreadable %s '%s': %s", label, path, e)
+        return {}
+
+    return obj if isinstance(obj, dict) else {}
+
+
+def write_json_file(path: Path, obj: dict[str, Any], label: str):
+    """Replaces file with a JSON object atomically, readable by its owner only.
+
+    Args:
+        path (Path): File to write, along with missing parent directories.
+        obj (dict[str, Any]): JSON-serializable object.
+        label (str): What the file holds, for warnings.
+    """
+
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # NamedTemporaryFile is created with owner-only permissions
+        with tempfile.NamedTemporaryFile(
+            "w",
+            dir=path.parent,
+            encoding="utf-8",
+            delete=False,
+        ) as f:
+            json.dump(obj, f)
+        os.replace(f.name, path)
+    except OSError as e:
+        _logger.warning("Unable to write %s '%s': %s", label, path, e)
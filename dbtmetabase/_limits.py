@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import email.utils
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+_logger = logging.getLogger(__name__)
+
+# HTTP statuses signalling the server or gateway is overloaded
+THROTTLE_STATUSES = (429, 503)
+
+
+class RateLimiter:
+    """Client-side limiter for API calls, shared by all threads of a client.
+
+    Concurrency adapts AIMD-style, like TCP congestion control: the limit grows by one
+    for every limit's worth of successful calls and halves when the server throttles.
+    An optional rate caps calls per second with a token bucket, and the whole client
+    pauses for as long as the server asks with Retry-After.
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 64
+    DEFAULT_MAX_RETRIES = 5
+    DEFAULT_BACKOFF_FACTOR = 1.0
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+    ):
+        """Client-side limiter for API calls.
+
+        Args:
+            rate (Optional[float], optional): Maximum calls per second, unlimited if None. Defaults to None.
+            max_concurrency (int, optional): Ceiling for the adaptive concurrency limit. Defaults to 64.
+            max_retries (int, optional): Number of times a throttled call is retried. Defaults to 5.
+            backoff_factor (float, optional): Seconds to wait before the first retry without Retry-After, doubled for each next one. Defaults to 1.
+        """
+
+        self.rate = rate
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+        self._limit = float(max_concurrency)
+        self._in_flight = 0
+        # Throttled calls started before the last decrease don't decrease again
+        self._generation = 0
+        self._paused_until = 0.0
+
+        self._burst = max(1.0, rate or 0)
+        self._tokens = self._burst
+        self._refilled = time.monotonic()
+
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of calls allowed in flight."""
+        return max(1, int(self._limit))
+
+    def acquire(self) -> int:
+        """Blocks until a call can start, returns a ticket for release()."""
+
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0 and self._in_flight < self.limit:
+                    wait = self._take_token(now)
+                    if wait <= 0:
+                        self._in_flight += 1
+                        return self._generation
+
+                # Without a deadline, wait for a call in flight to be released
+                self._condition.wait(timeout=wait if wait > 0 else None)
+
+    def release(self, ticket: int, throttled: bool):
+        """Records outcome of a finished call, adapting concurrency to it."""
+
+        with self._condition:
+            self._in_flight -= 1
+            if not throttled:
+                self._limit = min(self.max_concurrency, self._limit + 1 / self._limit)
+            elif ticket == self._generation:
+                self._generation += 1
+                self._limit = max(1.0, self._limit / 2)
+                _logger.debug("Throttled, concurrency limit reduced to %d", self.limit)
+            self._condition.notify_all()
+
+    def pause(self, seconds: float):
+        """Holds off all calls for a number of seconds."""
+
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+
+    def retry_delay(self, retry_after: Optional[str], attempt: int) -> float:
+        """Seconds to wait before retrying, as requested by the server or exponential backoff."""
+
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+
+            try:
+                retry_at = email.utils.parsedate_to_datetime(retry_after)
+                return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                _logger.debug("Unparsable Retry-After '%s'", retry_after)
+
+        return self.backoff_factor * 2**attempt
+
+    def _take_token(self, now: float) -> float:
+        """Takes a token from the bucket, or returns seconds until one is available."""
+
+        if not self.rate:
+            return 0
+
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._refilled) * self.rate
+        )
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self.rate
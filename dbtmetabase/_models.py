@@ -1,15 +1,29 @@
 from __future__ import annotations
 
+import asyncio
 import dataclasses as dc
 import logging
+import random
 import time
 from abc import ABCMeta, abstractmethod
-from typing import Any, Iterable, Mapping, MutableMapping, Optional
-
+from collections import ChainMap
+from typing import (
+    Any,
+    Collection,
+    Iterable,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+)
+
+import requests
+
+from ._fingerprints import FingerprintStore, fingerprint
 from .errors import MetabaseStateError
 from .format import Filter, NullValue, safe_name
-from .manifest import DEFAULT_SCHEMA, Column, Group, Manifest, Model
-from .metabase import Metabase
+from .manifest import DEFAULT_SCHEMA, CatalogColumn, Column, Manifest, Model
+from .metabase import AsyncMetabase, Metabase
 
 _logger = logging.getLogger(__name__)
 
@@ -17,9 +31,16 @@ _logger = logging.getLogger(__name__)
 class ModelsMixin(metaclass=ABCMeta):
     """Abstraction for exporting models."""
 
-    __SYNC_PERIOD = 5
+    # Seconds between schema checks, doubled after each up to the maximum
+    __SYNC_PERIOD = 1
+    __SYNC_MAX_PERIOD = 15
+
+    # Largest fraction of database tables retrieved one by one, rather than all at once
+    __TABLE_METADATA_SELECTIVITY = 0.2
 
     DEFAULT_MODELS_SYNC_TIMEOUT = 30
+    DEFAULT_MODELS_WORKERS = 1
+    DEFAULT_MODELS_RECONCILE_INTERVAL = 7
 
     @property
     @abstractmethod
@@ -31,6 +52,11 @@ class ModelsMixin(metaclass=ABCMeta):
     def metabase(self) -> Metabase:
         pass
 
+    @property
+    @abstractmethod
+    def async_metabase(self) -> AsyncMetabase:
+        pass
+
     def export_models(
         self,
         metabase_database: str,
@@ -42,6 +68,13 @@ class ModelsMixin(metaclass=ABCMeta):
         append_tags: bool = False,
         docs_url: Optional[str] = None,
         order_fields: bool = False,
+        state_path: Optional[str] = None,
+        use_catalog: bool = False,
+        workers: int = DEFAULT_MODELS_WORKERS,
+        force_sync: bool = False,
+        fingerprints_path: Optional[str] = None,
+        reconcile_interval: int = DEFAULT_MODELS_RECONCILE_INTERVAL,
+        full_reconcile: bool = False,
     ):
         """Exports dbt models to Metabase database schema.
 
@@ -55,6 +88,13 @@ class ModelsMixin(metaclass=ABCMeta):
             append_tags (bool, optional): Append dbt tags to table descriptions. Defaults to False.
             docs_url (Optional[str], optional): URL for dbt docs hosting, to append model links to table descriptions. Defaults to None.
             order_fields (bool, optional): Preserve column order in dbt project.
+            state_path (Optional[str], optional): Path to dbt target directory from a previous run, to only export models and columns modified since. Defaults to None.
+            use_catalog (bool, optional): Read physical columns from catalog.json in dbt target directory, to wait for and order all columns rather than only documented ones. Defaults to False.
+            workers (int, optional): Number of updates applied to Metabase concurrently, capped by HTTP concurrency. Defaults to 1.
+            force_sync (bool, optional): Sync schema of the whole database even if all tables and columns are already in Metabase, e.g. to pick up changed column types. Defaults to False.
+            fingerprints_path (Optional[str], optional): Path to file with fingerprints of models exported before, created if missing, to only export models and columns changed since. Defaults to None.
+            reconcile_interval (int, optional): Number of days after which each model is exported as a whole regardless of fingerprints, to revert changes made in Metabase. Defaults to 7.
+            full_reconcile (bool, optional): Export all models regardless of fingerprints now. Defaults to False.
         """
 
         ctx = self.__Context()
@@ -64,55 +104,99 @@ class ModelsMixin(metaclass=ABCMeta):
         if not database:
             raise MetabaseStateError(f"Database not found: {metabase_database}")
 
-        models = self.__filtered_models(
-            models=self.manifest.read_models(),
+        models = self.manifest.read_models(
             database_filter=database_filter,
             schema_filter=schema_filter,
             model_filter=model_filter,
             skip_sources=skip_sources,
         )
 
-        self.metabase.sync_database_schema(database["id"])
+        if state_path:
+            models = self.__modified_models(
+                ctx=ctx,
+                models=models,
+                modified=self.manifest.diff_models(Manifest(target_dir=state_path)),
+                since=f"state '{state_path}'",
+            )
+            if not models:
+                _logger.info("No models modified since state '%s'", state_path)
+                return
 
-        deadline = int(time.time()) + sync_timeout
-        synced = False
-        while not synced:
-            time.sleep(self.__SYNC_PERIOD)
+        if use_catalog:
+            ctx.catalog = self.manifest.read_catalog(
+                unique_ids={str(m.unique_id) for m in models}
+            )
 
-            tables = self.__get_tables(database["id"])
+        store = FingerprintStore(fingerprints_path) if fingerprints_path else None
+        if store:
+            stored = store.get(self.metabase.url, database["id"])
+            fingerprints = self.__fingerprints(
+                ctx=ctx,
+                models=models,
+                append_tags=append_tags,
+                docs_url=docs_url,
+                order_fields=order_fields,
+            )
 
-            synced = True
-            for model in models:
-                schema_name = model.schema.upper()
-                model_name = model.alias.upper()
-                table_key = f"{schema_name}.{model_name}"
+            if full_reconcile:
+                _logger.info("Exporting all models regardless of fingerprints")
+                reconcile_before = float("inf")
+            else:
+                reconcile_before = time.time() - reconcile_interval * 24 * 60 * 60
 
-                table = tables.get(table_key)
-                if not table:
-                    _logger.warning(
-                        "Table '%s' not in schema '%s'", table_key, schema_name
-                    )
-                    synced = False
-                    continue
+            models = self.__modified_models(
+                ctx=ctx,
+                models=models,
+                modified=self.__changed_models(
+                    models=models,
+                    fingerprints=fingerprints,
+                    stored=stored.get("models", {}),
+                    reconcile_before=reconcile_before,
+                ),
+                since="last export",
+            )
+            if not models:
+                _logger.info("No models changed since last export")
+                return
 
-                for column in model.columns:
-                    column_name = column.name.upper()
+        expected = self.__expected_columns(ctx, models)
 
-                    field = table.get("fields", {}).get(column_name)
-                    if not field:
-                        _logger.warning(
-                            "Field '%s' not in table '%s'", column_name, table_key
-                        )
-                        synced = False
-                        continue
+        # Checked first, schema is usually in sync already
+        started = time.monotonic()
+        ctx.tables = self.__fetch_tables(database, models, expected)
+        pending = self.__pending_columns(ctx, expected)
 
-            ctx.tables = tables
+        if pending or force_sync:
+            self.__sync_schema(ctx, database, pending, force_sync)
+            pending = self.__wait_for_sync(
+                ctx=ctx,
+                database=database,
+                expected=expected,
+                sync_timeout=sync_timeout,
+            )
+            _logger.info("Schema sync waited for %.1fs", time.monotonic() - started)
+        else:
+            last_sync = self.metabase.get_last_sync_duration(database["id"])
+            _logger.info(
+                "All %d tables in sync, skipped schema sync of database '%s' (checked in %.1fs%s)",
+                len(expected),
+                metabase_database,
+                time.monotonic() - started,
+                f", last sync took {last_sync:.1f}s" if last_sync is not None else "",
+            )
 
-            if int(time.time()) > deadline:
-                break
+        for table_key, missing in sorted(pending.items()):
+            if missing is None:
+                _logger.warning(
+                    "Table '%s' not in schema '%s'", table_key, table_key.split(".")[0]
+                )
+            else:
+                _logger.warning("Fields %s not in table '%s'", missing, table_key)
 
-        if not synced and sync_timeout:
-            raise MetabaseStateError("Unable to sync models with Metabase")
+        if pending and sync_timeout:
+            raise MetabaseStateError(
+                f"Unable to sync models with Metabase, pending: {', '.join(sorted(pending))}"
+            )
 
         for model in models:
             success &= self.__export_model(
@@ -123,32 +207,127 @@ class ModelsMixin(metaclass=ABCMeta):
                 order_fields=order_fields,
             )
 
+        failed = self.__apply_updates(ctx, workers=workers)
+        if failed:
+            raise MetabaseStateError(
+                f"Failed to apply {failed} of {len(ctx.updates)} updates, see above"
+            )
+
+        if not success:
+            raise MetabaseStateError("Non-critical errors encountered, see above")
+
+        if store:
+            reconciled = time.time()
+            stored_models = stored.setdefault("models", {})
+            for model in models:
+                unique_id = str(model.unique_id)
+                if unique_id in ctx.partial_models:
+                    stored_model = stored_models.setdefault(unique_id, {"fields": {}})
+                    stored_model["table"] = fingerprints[unique_id]["table"]
+                    stored_model["fields"].update(
+                        (c.name, fingerprints[unique_id]["fields"][c.name])
+                        for c in model.columns
+                    )
+                else:
+                    # Compared with Metabase as a whole, so reconciled
+                    stored_models[unique_id] = {
+                        **fingerprints[unique_id],
+                        "reconciled": reconciled,
+                    }
+
+            store.set(self.metabase.url, database["id"], stored)
+
+    def __apply_updates(self, ctx: __Context, workers: int) -> int:
+        """Applies queued updates concurrently and returns the number of failures.
+
+        Primary keys are applied first, in a separate wave, because foreign keys
+        pointing to them are only accepted by Metabase once they are in place.
+        """
+
+        if workers > self.async_metabase.concurrency:
+            _logger.warning(
+                "Only %d of %d workers can run concurrently, increase HTTP concurrency",
+                self.async_metabase.concurrency,
+                workers,
+            )
+
+        primary_keys = []
+        others = []
         for update in ctx.updates.values():
+            body = update.get("body", {})
+            if update["kind"] == "field" and "type/PK" in (
+                body.get("semantic_type"),
+                body.get("special_type"),
+            ):
+                primary_keys.append(update)
+            else:
+                others.append(update)
+
+        async def apply_wave(wave: Sequence[Mapping]) -> list[bool]:
+            semaphore = asyncio.Semaphore(workers)
+
+            async def apply(update: Mapping) -> bool:
+                async with semaphore:
+                    return await self.__apply_update(update)
+
+            return list(await asyncio.gather(*(apply(u) for u in wave)))
+
+        failed = 0
+        failed_ids = set()
+        # One coroutine per wave, its semaphore is created on the loop running it
+        (applied_keys,) = self.async_metabase.run_all(apply_wave(primary_keys))
+        for update, applied in zip(primary_keys, applied_keys):
+            if not applied:
+                failed += 1
+                failed_ids.add(update["id"])
+
+        applicable = []
+        for update in others:
+            fk_target_field_id = update.get("body", {}).get("fk_target_field_id")
+            if update["kind"] == "field" and fk_target_field_id in failed_ids:
+                _logger.error(
+                    "Field '%s' skipped, its foreign key target failed to update",
+                    update["label"],
+                )
+                failed += 1
+                continue
+            applicable.append(update)
+
+        (applied_others,) = self.async_metabase.run_all(apply_wave(applicable))
+        failed += applied_others.count(False)
+        return failed
+
+    async def __apply_update(self, update: Mapping) -> bool:
+        """Applies one queued update, logging rather than raising on failure."""
+
+        label = " ".join(update["kind"].split("_")).capitalize()
+        try:
             if update["kind"] == "table":
-                self.metabase.update_table(
+                await self.async_metabase.update_table(
                     uid=update["id"],
                     body=update["body"],
                 )
             elif update["kind"] == "table_field_order":
-                self.metabase.update_table_field_order(
+                await self.async_metabase.update_table_field_order(
                     uid=update["id"],
                     body=list(update["body"]["values"]),
                 )
             elif update["kind"] == "field":
-                self.metabase.update_field(
+                await self.async_metabase.update_field(
                     uid=update["id"],
                     body=update["body"],
                 )
+        except requests.exceptions.RequestException as e:
+            _logger.error("%s '%s' failed to update: %s", label, update["label"], e)
+            return False
 
-            _logger.info(
-                "%s '%s' updated successfully: %s",
-                " ".join(update["kind"].split("_")).capitalize(),
-                update["label"],
-                ", ".join(update.get("body", {})),
-            )
-
-        if not success:
-            raise MetabaseStateError("Non-critical errors encountered, see above")
+        _logger.info(
+            "%s '%s' updated successfully: %s",
+            label,
+            update["label"],
+            ", ".join(update.get("body", {})),
+        )
+        return True
 
     def __export_model(
         self,
@@ -166,7 +345,7 @@ class ModelsMixin(metaclass=ABCMeta):
         model_name = model.alias.upper()
         table_key = f"{schema_name}.{model_name}"
 
-        api_table = ctx.tables.get(table_key)
+        api_table = ctx.get_table(table_key)
         if not api_table:
             _logger.error("Table '%s' does not exist", table_key)
             return False
@@ -198,7 +377,9 @@ class ModelsMixin(metaclass=ABCMeta):
             body_table["visibility_type"] = model_visibility
 
         if body_table:
-            ctx.update(entity=api_table, change=body_table, label=table_key)
+            ctx.update(
+                kind="table", entity=api_table, change=body_table, label=table_key
+            )
             _logger.info(
                 "Table '%s' will be updated: %s", table_key, ", ".join(body_table)
             )
@@ -213,7 +394,7 @@ class ModelsMixin(metaclass=ABCMeta):
                 column=column,
             )
 
-        if order_fields:
+        if order_fields and model.unique_id not in ctx.partial_models:
             success &= self.__export_model_column_order(
                 ctx=ctx,
                 model=model,
@@ -237,7 +418,8 @@ class ModelsMixin(metaclass=ABCMeta):
             api_ord[field["id"]] = field["name"]
 
         dbt_ord = {}
-        for column in model.columns:
+        # Catalog also has undocumented columns, so order is complete
+        for column in ctx.catalog.get(str(model.unique_id)) or model.columns:
             field_id = ctx.get_field(table_key, column.name.upper()).get("id")
             if field_id:
                 dbt_ord[field_id] = column.name
@@ -251,10 +433,8 @@ class ModelsMixin(metaclass=ABCMeta):
 
             if api_keys == dbt_keys:
                 ctx.update(
-                    entity={
-                        "kind": "table_field_order",
-                        "id": api_table["id"],
-                    },
+                    kind="table_field_order",
+                    entity={"id": api_table["id"]},
                     change={"values": dbt_ord.keys()},
                     label=table_key,
                 )
@@ -330,6 +510,7 @@ class ModelsMixin(metaclass=ABCMeta):
                             column_label,
                         )
                         ctx.update(
+                            kind="field",
                             entity=fk_target_field,
                             change={semantic_type_key: "type/PK"},
                             label=fk_target_field_label,
@@ -384,7 +565,7 @@ class ModelsMixin(metaclass=ABCMeta):
         ):
             body_field["coercion_strategy"] = column.coercion_strategy
 
-        settings = api_field.get("settings") or {}
+        settings = dict(api_field.get("settings") or {})
         if settings.get("number_style") != column.number_style and column.number_style:
             settings["number_style"] = column.number_style
 
@@ -399,7 +580,9 @@ class ModelsMixin(metaclass=ABCMeta):
             body_field[semantic_type_key] = column.semantic_type or None
 
         if body_field:
-            ctx.update(entity=api_field, change=body_field, label=column_label)
+            ctx.update(
+                kind="field", entity=api_field, change=body_field, label=column_label
+            )
             _logger.info(
                 "Field '%s' will be updated: %s", column_label, ", ".join(body_field)
             )
@@ -408,7 +591,193 @@ class ModelsMixin(metaclass=ABCMeta):
 
         return success
 
-    def __get_tables(self, database_id: str) -> Mapping[str, MutableMapping]:
+    def __sync_schema(
+        self,
+        ctx: __Context,
+        database: Mapping,
+        pending: Mapping[str, Optional[list[str]]],
+        force_sync: bool,
+    ):
+        """Triggers schema sync of tables missing fields, or of the whole database.
+
+        New tables are only discovered by syncing the database.
+        """
+
+        table_ids = [
+            ctx.tables[table_key]["id"]
+            for table_key, missing in pending.items()
+            if missing is not None
+        ]
+
+        if not force_sync and len(table_ids) == len(pending):
+            _logger.info(
+                "Syncing schema of %d tables missing fields: %s",
+                len(table_ids),
+                ", ".join(sorted(pending)),
+            )
+            try:
+                self.async_metabase.run_all(
+                    *(self.async_metabase.sync_table_schema(uid) for uid in table_ids)
+                )
+                return
+            except requests.exceptions.HTTPError as e:
+                if e.response is None or e.response.status_code != 404:
+                    raise
+                _logger.info("Table sync not supported by Metabase, syncing database")
+
+        elif force_sync:
+            _logger.info("Syncing schema of database, as forced")
+        else:
+            _logger.info(
+                "Syncing schema of database, %d tables not in Metabase",
+                len(pending) - len(table_ids),
+            )
+
+        self.metabase.sync_database_schema(database["id"])
+
+    def __wait_for_sync(
+        self,
+        ctx: __Context,
+        database: Mapping,
+        expected: Mapping[str, Sequence[str]],
+        sync_timeout: int,
+    ) -> dict[str, Optional[list[str]]]:
+        """Waits for schema sync to catch up with expected columns, returns those still pending.
+
+        Checks back off exponentially with jitter. Only pending tables are retrieved again,
+        rather than metadata of the whole database.
+        """
+
+        deadline = time.monotonic() + sync_timeout
+        pending = self.__pending_columns(ctx, expected)
+
+        attempt = 0
+        while pending and (remaining := deadline - time.monotonic()) > 0:
+            _logger.info(
+                "Waiting for Metabase to sync %d tables: %s",
+                len(pending),
+                ", ".join(sorted(pending)),
+            )
+
+            period = min(self.__SYNC_MAX_PERIOD, self.__SYNC_PERIOD * 2**attempt)
+            time.sleep(min(remaining, random.uniform(period / 2, period)))
+            attempt += 1
+
+            self.__refresh_tables(ctx, database, pending)
+            pending = self.__pending_columns(ctx, expected)
+
+        return pending
+
+    def __refresh_tables(
+        self,
+        ctx: __Context,
+        database: Mapping,
+        pending: Mapping[str, Optional[list[str]]],
+    ):
+        """Retrieves pending tables again, with their fields."""
+
+        default_schema = database.get("details", {}).get("dataset-id")
+
+        table_ids = [
+            ctx.tables[table_key]["id"]
+            for table_key, missing in pending.items()
+            if missing is not None
+        ]
+
+        # Tables appear in the listing once synced, before retrieving their fields
+        if None in pending.values():
+            for table in self.metabase.get_tables(
+                lower=False,
+                database_id=database["id"],
+                refresh=True,
+            ):
+                table_key = self.__table_key(table, default_schema)
+                if table_key in pending and pending[table_key] is None:
+                    table_ids.append(table["id"])
+
+        for table in self.async_metabase.run_all(
+            *(self.async_metabase.get_table_metadata(uid=uid) for uid in table_ids)
+        ):
+            table_key, new_table = self.__index_table(table, default_schema)
+            ctx.tables[table_key] = new_table
+
+    @staticmethod
+    def __pending_columns(
+        ctx: __Context,
+        expected: Mapping[str, Sequence[str]],
+    ) -> dict[str, Optional[list[str]]]:
+        """Lists expected columns missing in Metabase by table, none if the table is."""
+
+        pending: dict[str, Optional[list[str]]] = {}
+        for table_key, column_names in expected.items():
+            table = ctx.tables.get(table_key)
+            if not table:
+                pending[table_key] = None
+                continue
+
+            missing = [c for c in column_names if c not in table.get("fields", {})]
+            if missing:
+                pending[table_key] = missing
+
+        return pending
+
+    def __fetch_tables(
+        self,
+        database: Mapping,
+        models: Iterable[Model],
+        expected: Mapping[str, Sequence[str]],
+    ) -> MutableMapping[str, MutableMapping]:
+        """Retrieves tables of exported models and their foreign key targets.
+
+        A few tables out of many are retrieved concurrently, one by one. Otherwise,
+        or if any is not listed yet, metadata of the whole database is retrieved.
+        """
+
+        table_keys = set(expected)
+        for model in models:
+            for column in model.columns:
+                if column.semantic_type == "type/FK" and column.fk_target_table:
+                    table_keys.add(column.fk_target_table.upper())
+
+        default_schema = database.get("details", {}).get("dataset-id")
+        listed = {
+            self.__table_key(table, default_schema): table["id"]
+            for table in self.metabase.get_tables(
+                lower=False, database_id=database["id"]
+            )
+        }
+        table_ids = [listed[k] for k in table_keys if k in listed]
+
+        if not expected.keys() <= listed.keys():
+            _logger.debug("Tables not listed yet, retrieving database metadata")
+            return self.__get_tables(database["id"], table_keys)
+
+        if len(table_ids) > self.__TABLE_METADATA_SELECTIVITY * len(listed):
+            _logger.debug(
+                "Retrieving database metadata for %d out of %d tables",
+                len(table_ids),
+                len(listed),
+            )
+            return self.__get_tables(database["id"], table_keys)
+
+        _logger.info(
+            "Retrieving metadata of %d out of %d tables", len(table_ids), len(listed)
+        )
+        tables = {}
+        for table in self.async_metabase.run_all(
+            *(self.async_metabase.get_table_metadata(uid=uid) for uid in table_ids)
+        ):
+            table_key, new_table = self.__index_table(table, default_schema)
+            tables[table_key] = new_table
+        return tables
+
+    def __get_tables(
+        self,
+        database_id: str,
+        table_keys: Optional[Collection[str]] = None,
+    ) -> MutableMapping[str, MutableMapping]:
+        """Retrieves metadata of the whole database, keeping only selected tables if specified."""
+
         tables = {}
 
         metadata = self.metabase.get_database_metadata(database_id)
@@ -416,61 +785,199 @@ class ModelsMixin(metaclass=ABCMeta):
         bigquery_schema = metadata.get("details", {}).get("dataset-id")
 
         for table in metadata.get("tables", []):
-            # table[schema] is null for bigquery datasets
-            table["schema"] = (
-                table.get("schema") or bigquery_schema or DEFAULT_SCHEMA
-            ).upper()
+            table_key = self.__table_key(table, bigquery_schema)
+            if table_keys is not None and table_key not in table_keys:
+                continue
 
-            fields = {}
-            for field in table.get("fields", []):
-                new_field = field.copy()
-                new_field["kind"] = "field"
+            table_key, table = self.__index_table(table, bigquery_schema)
+            tables[table_key] = table
 
-                field_name = field["name"].upper()
-                fields[field_name] = new_field
+        return tables
 
-            new_table = table.copy()
-            new_table["kind"] = "table"
-            new_table["fields"] = fields
+    @classmethod
+    def __index_table(
+        cls,
+        table: MutableMapping,
+        default_schema: Optional[str],
+    ) -> tuple[str, MutableMapping]:
+        """Keys table by schema and name, and its fields by name.
 
-            schema_name = table["schema"].upper()
-            table_name = table["name"].upper()
-            tables[f"{schema_name}.{table_name}"] = new_table
+        Indexes the retrieved table in place, fields are referenced rather than copied.
+        """
 
-        return tables
+        table_key = cls.__table_key(table, default_schema)
+        table["schema"] = table_key.split(".")[0]
+        table["fields"] = {
+            field["name"].upper(): field for field in table.get("fields", [])
+        }
+        return table_key, table
 
     @staticmethod
-    def __filtered_models(
+    def __table_key(table: Mapping, default_schema: Optional[str]) -> str:
+        # table[schema] is null for bigquery datasets
+        schema_name = (table.get("schema") or default_schema or DEFAULT_SCHEMA).upper()
+        return f"{schema_name}.{table['name'].upper()}"
+
+    @staticmethod
+    def __expected_columns(
+        ctx: __Context,
         models: Iterable[Model],
-        database_filter: Optional[Filter],
-        schema_filter: Optional[Filter],
-        model_filter: Optional[Filter],
-        skip_sources: bool,
-    ) -> Iterable[Model]:
-        def selected(m: Model) -> bool:
-            return (
-                (not skip_sources or m.group != Group.sources)
-                and (not database_filter or database_filter.match(m.database))
-                and (not schema_filter or schema_filter.match(m.schema))
-                and (not model_filter or model_filter.match(m.name))
-            )
+    ) -> dict[str, list[str]]:
+        """Lists columns expected in Metabase by table, from catalog where available."""
+
+        expected = {}
+        for model in models:
+            table_key = f"{model.schema.upper()}.{model.alias.upper()}"
+            column_names = [c.name.upper() for c in model.columns]
 
-        return list(filter(selected, models))
+            catalog_columns = ctx.catalog.get(str(model.unique_id))
+            if catalog_columns is not None:
+                physical_names = [c.name.upper() for c in catalog_columns]
 
-    @dc.dataclass
-    class __Context:
-        tables: Mapping[str, MutableMapping] = dc.field(default_factory=dict)
-        updates: MutableMapping[str, MutableMapping] = dc.field(default_factory=dict)
+                # Never going to appear in Metabase, no point waiting for them
+                missing = set(column_names).difference(physical_names)
+                if missing:
+                    _logger.warning(
+                        "Fields %s not in catalog for table '%s'",
+                        sorted(missing),
+                        table_key,
+                    )
+                column_names = physical_names
+            elif ctx.catalog:
+                _logger.debug("Table '%s' not in catalog", table_key)
+
+            expected[table_key] = column_names
+
+        return expected
+
+    @staticmethod
+    def __modified_models(
+        ctx: __Context,
+        models: Iterable[Model],
+        modified: Mapping[str, Optional[set[str]]],
+        since: str,
+    ) -> list[Model]:
+        """Narrows models to those modified, and their columns to modified ones."""
+
+        results = []
+        for model in models:
+            unique_id = model.unique_id
+            if unique_id is None or unique_id not in modified:
+                _logger.debug("Model '%s' not modified, skipping", model.name)
+                continue
+
+            columns = modified[unique_id]
+            if columns is not None:
+                model = dc.replace(
+                    model,
+                    columns=[c for c in model.columns if c.name in columns],
+                )
+                ctx.partial_models.add(unique_id)
 
-        def get_field(self, table_key: str, field_key: str) -> MutableMapping:
-            return self.tables.get(table_key, {}).get("fields", {}).get(field_key, {})
+            results.append(model)
 
-        def update(self, entity: MutableMapping, change: Mapping, label: str):
-            entity.update(change)
+        _logger.info("Exporting %d models modified since %s", len(results), since)
+        return results
 
-            key = f"{entity['kind']}.{entity['id']}"
+    @staticmethod
+    def __fingerprints(
+        ctx: __Context,
+        models: Iterable[Model],
+        append_tags: bool,
+        docs_url: Optional[str],
+        order_fields: bool,
+    ) -> dict[str, dict[str, Any]]:
+        """Fingerprints everything exported of models, their tables and fields by name."""
+
+        fingerprints = {}
+        for model in models:
+            unique_id = str(model.unique_id)
+
+            field_order = None
+            if order_fields and unique_id not in ctx.partial_models:
+                columns = ctx.catalog.get(unique_id) or model.columns
+                field_order = [c.name.upper() for c in columns]
+
+            fingerprints[unique_id] = {
+                "table": fingerprint(
+                    f"{model.schema.upper()}.{model.alias.upper()}",
+                    model.display_name,
+                    model.format_description(append_tags, docs_url),
+                    model.points_of_interest,
+                    model.caveats,
+                    model.visibility_type,
+                    field_order,
+                ),
+                "fields": {c.name: fingerprint(*dc.astuple(c)) for c in model.columns},
+            }
+
+        return fingerprints
+
+    @staticmethod
+    def __changed_models(
+        models: Iterable[Model],
+        fingerprints: Mapping[str, Mapping[str, Any]],
+        stored: Mapping[str, Mapping[str, Any]],
+        reconcile_before: float,
+    ) -> dict[str, Optional[set[str]]]:
+        """Lists models with fingerprints changed since stored, and changed columns if only they are.
+
+        Models last reconciled before the given time are listed as a whole regardless.
+        """
+
+        changed: dict[str, Optional[set[str]]] = {}
+        for model in models:
+            unique_id = str(model.unique_id)
+            current = fingerprints[unique_id]
+            previous = stored.get(unique_id)
+
+            if not previous or previous.get("table") != current["table"]:
+                changed[unique_id] = None
+                continue
+
+            if previous.get("reconciled", 0) <= reconcile_before:
+                _logger.debug("Model '%s' due for reconcile", model.name)
+                changed[unique_id] = None
+                continue
+
+            previous_fields = previous.get("fields", {})
+            columns = {
+                name
+                for name, value in current["fields"].items()
+                if previous_fields.get(name) != value
+            }
+            if columns:
+                changed[unique_id] = columns
+
+        return changed
+
+    @dc.dataclass
+    class __Context:
+        tables: MutableMapping[str, MutableMapping] = dc.field(default_factory=dict)
+        updates: MutableMapping[str, MutableMapping] = dc.field(default_factory=dict)
+        # Models with only some columns modified, field order left unchanged
+        partial_models: set[str] = dc.field(default_factory=set)
+        # Physical columns by model unique ID, when catalog is used
+        catalog: Mapping[str, Sequence[CatalogColumn]] = dc.field(default_factory=dict)
+
+        def get_table(self, table_key: str) -> Mapping:
+            table = self.tables.get(table_key)
+            return self.current("table", table) if table else {}
+
+        def get_field(self, table_key: str, field_key: str) -> Mapping:
+            field = self.tables.get(table_key, {}).get("fields", {}).get(field_key)
+            return self.current("field", field) if field else {}
+
+        def current(self, kind: str, entity: MutableMapping) -> Mapping:
+            """Entity as retrieved from Metabase, with pending changes on top."""
+            update = self.updates.get(f"{kind}.{entity['id']}")
+            return ChainMap(update["body"], entity) if update else entity
+
+        def update(self, kind: str, entity: Mapping, change: Mapping, label: str):
+            # Retrieved entity is left as is, changes are only tracked here
+            key = f"{kind}.{entity['id']}"
             update = self.updates.get(key, {})
-            update["kind"] = entity["kind"]
+            update["kind"] = kind
             update["id"] = entity["id"]
             update["label"] = label
 
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Optional, Union
+
+from ._json import read_json_file, write_json_file
+
+# Default session cache location, next to logs
+DEFAULT_SESSION_CACHE_PATH = Path.home() / ".dbt-metabase" / "sessions.json"
+
+
+class SessionCache:
+    """Metabase session tokens persisted between runs, keyed by URL and username.
+
+    Tokens are as good as passwords until they expire, so the file is only readable
+    by its owner and keys are hashed rather than listing instances and users.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_SESSION_CACHE_PATH):
+        self.path = Path(path).expanduser()
+
+    def get(self, url: str, username: str) -> Optional[str]:
+        """Returns cached session token, if any."""
+        return self._read().get(self._key(url, username))
+
+    def set(self, url: str, username: str, token: Optional[str]):
+        """Stores session token, or removes it when none."""
+
+        sessions = self._read()
+        key = self._key(url, username)
+        if token:
+            sessions[key] = token
+        elif sessions.pop(key, None) is None:
+            return
+        self._write(sessions)
+
+    @staticmethod
+    def _key(url: str, username: str) -> str:
+        return hashlib.sha256(f"{url}\n{username}".encode("utf-8")).hexdigest()
+
+    def _read(self) -> dict[str, str]:
+        return read_json_file(self.path, "session cache")
+
+    def _write(self, sessions: dict[str, str]):
+        write_json_file(self.path, sessions, "session cache")
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+_logger = logging.getLogger(__name__)
+
+# Encoding headers describe the body as received, they no longer apply once it's
+# decoded, and cookies carry session tokens, e.g. metabase.SESSION after login
+_UNRECORDED_HEADERS = (
+    "content-encoding",
+    "content-length",
+    "transfer-encoding",
+    "set-cookie",
+)
+
+# Session tokens are not written to cassettes
+_SESSION_PATH = "/api/session"
+_REDACTED_SESSION = b'{"id": "replay"}'
+
+
+def _request_key(request: requests.PreparedRequest) -> str:
+    """Identifies a request by method, path and query, e.g. "GET /api/card?f=all".
+
+    Bodies are not part of it, because writes often contain generated IDs.
+    """
+
+    url = urlsplit(request.url or "")
+    query = urlencode(sorted(parse_qsl(url.query, keep_blank_values=True)))
+    return f"{request.method} {url.path}" + (f"?{query}" if query else "")
+
+
+class Cassette:
+    """Directory of recorded API responses, one file per request key.
+
+    Cassettes contain everything Metabase responded with, treat them like a database dump.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path).expanduser()
+        self._interactions: dict[str, list[dict]] = {}
+        self._served: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> Cassette:
+        """Reads all recorded responses from the directory."""
+
+        for file in sorted(self.path.glob("*.json")):
+            with open(file, encoding="utf-8") as f:
+                recorded = json.load(f)
+            self._interactions[recorded["request"]] = recorded["responses"]
+
+        _logger.info(
+            "Loaded %d recorded requests from '%s'", len(self._interactions), self.path
+        )
+        return self
+
+    def append(self, key: str, response: requests.Response):
+        """Records a response and writes its request file."""
+
+        content = response.content
+        if key.startswith(f"POST {_SESSION_PATH}") and response.ok:
+            content = _REDACTED_SESSION
+
+        recorded = {
+            "status": response.status_code,
+            "headers": {
+                k: v
+                for k, v in response.headers.items()
+                if k.lower() not in _UNRECORDED_HEADERS
+            },
+            "body": content.decode("utf-8", errors="replace"),
+        }
+
+        with self._lock:
+            responses = self._interactions.setdefault(key, [])
+            responses.append(recorded)
+
+            self.path.mkdir(parents=True, exist_ok=True)
+            with open(self._file(key), "w", encoding="utf-8") as f:
+                json.dump({"request": key, "responses": responses}, f, indent=2)
+
+    def next(self, key: str) -> Optional[dict]:
+        """Returns responses of a request in recorded order, repeating the last one."""
+
+        with self._lock:
+            responses = self._interactions.get(key)
+            if not responses:
+                return None
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+            return responses[min(served, len(responses) - 1)]
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport adapter recording responses of another adapter to a cassette."""
+
+    def __init__(self, path: Union[str, Path], adapter: Optional[HTTPAdapter] = None):
+        """Transport adapter recording responses to a cassette.
+
+        Args:
+            path (Union[str, Path]): Cassette directory, created if missing.
+            adapter (Optional[HTTPAdapter], optional): Adapter sending requests. Defaults to plain HTTPAdapter.
+        """
+
+        super().__init__()
+        self.cassette = Cassette(path)
+        self.adapter = adapter or HTTPAdapter()
+
+    def send(self, request, *args, **kwargs):  # pylint: disable=arguments-differ
+        response = self.adapter.send(request, *args, **kwargs)
+        self.cassette.append(_request_key(request), response)
+        return response
+
+    def close(self):
+        super().close()
+        self.adapter.close()
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Transport adapter answering from a cassette instead of Metabase.
+
+    Latency, jitter and errors are simulated per request, to benchmark against
+    realistic traffic without a live server. Unrecorded requests get 404.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        latency: float = 0,
+        jitter: float = 0,
+        error_rate: float = 0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ):
+        """Transport adapter answering from a cassette.
+
+        Args:
+            path (Union[str, Path]): Cassette directory with recorded responses.
+            latency (float, optional): Seconds to wait before every response. Defaults to 0.
+            jitter (float, optional): Maximum seconds randomly added to or subtracted from latency. Defaults to 0.
+            error_rate (float, optional): Fraction of requests failing with error status instead. Defaults to 0.
+            error_status (int, optional): HTTP status of failed requests. Defaults to 503.
+            seed (Optional[int], optional): Seed for reproducible jitter and errors. Defaults to None.
+        """
+
+        super().__init__()
+        self.cassette = Cassette(path).load()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+    def send(self, request, *_args, **_kwargs):  # pylint: disable=arguments-differ
+        with self._random_lock:
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+            failed = self._random.random() < self.error_rate
+        time.sleep(max(0.0, delay))
+
+        key = _request_key(request)
+        if failed:
+            return self._response(request, self.error_status, {}, b"")
+
+        recorded = self.cassette.next(key)
+        if recorded is None:
+            _logger.warning("Request not recorded: %s", key)
+            return self._response(request, 404, {}, b'"Not found."')
+
+        return self._response(
+            request,
+            recorded["status"],
+            recorded["headers"],
+            recorded["body"].encode("utf-8"),
+        )
+
+    @staticmethod
+    def _response(
+        request: requests.PreparedRequest,
+        status: int,
+        headers: dict[str, str],
+        content: bytes,
+    ) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = content  # pylint: disable=protected-access
+        response.encoding = "utf-8"
+        response.url = request.url or ""
+        response.request = request
+        return response
@@ -4,13 +4,15 @@ import logging
 from pathlib import Path
 from typing import Optional, Tuple, Union
 
-from requests.adapters import HTTPAdapter
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 
+from ._cards import CardsCreator
 from ._exposures import ExposuresMixin
+from ._limits import RateLimiter
 from ._models import ModelsMixin
-from ._cards import CardsCreator
+from ._sessions import SessionCache
 from .manifest import Manifest
-from .metabase import Metabase
+from .metabase import AsyncMetabase, Metabase
 
 _logger = logging.getLogger(__name__)
 
@@ -35,6 +37,15 @@ class DbtMetabase(ModelsMixin, ExposuresMixin, CardsCreator):
         http_headers: Optional[dict] = None,
         http_adapter: Optional[HTTPAdapter] = None,
         target_dir: str = TARGET_DIR,
+        stream_manifest: bool = False,
+        manifest_cache: bool = False,
+        http_concurrency: int = AsyncMetabase.DEFAULT_CONCURRENCY,
+        metabase_session_cache: bool = False,
+        http_rate_limit: Optional[float] = None,
+        http_pool_size: Optional[int] = None,
+        http_pool_block: bool = False,
+        http_compression: bool = False,
+        http_record_path: Optional[str] = None,
     ):
         """dbt + Metabase integration.
 
@@ -50,9 +61,25 @@ class DbtMetabase(ModelsMixin, ExposuresMixin, CardsCreator):
             http_timeout (int, optional): HTTP request timeout in secs. Defaults to 15.
             http_headers (Optional[dict], optional): Additional HTTP headers. Defaults to None.
             http_adapter (Optional[HTTPAdapter], optional): Custom requests HTTP adapter. Defaults to None.
+            target_dir (str, optional): Path to dbt target directory with manifest.json. Defaults to "target".
+            stream_manifest (bool, optional): Read manifest.json incrementally to bound memory on large projects. Defaults to False.
+            manifest_cache (bool, optional): Persist parsed manifest under target directory between runs, as pickle files loaded on later runs, so only for target directories you trust. Defaults to False.
+            http_concurrency (int, optional): Maximum number of Metabase API calls in flight when issued concurrently. Defaults to 8.
+            metabase_session_cache (bool, optional): Reuse sessions from username/password logins between runs, stored in ~/.dbt-metabase/sessions.json readable only by the current user. Defaults to False.
+            http_rate_limit (Optional[float], optional): Maximum Metabase API calls per second, on top of concurrency adapting to throttling by the server. Defaults to None.
+            http_pool_size (Optional[int], optional): Number of connections to Metabase kept alive, ignored with custom HTTP adapter. Defaults to None, derived from HTTP concurrency.
+            http_pool_block (bool, optional): Never open more connections to Metabase than the pool size, waiting for one to be released instead. Defaults to False.
+            http_compression (bool, optional): Compress large request bodies with gzip, requires Metabase or a proxy in front of it to accept them. Defaults to False.
+            http_record_path (Optional[str], optional): Directory to record Metabase API responses to, for replaying with ReplayAdapter. Defaults to None.
         """
 
-        self._manifest = Manifest(target_dir=target_dir)
+        self._manifest = Manifest(
+            target_dir=target_dir,
+            stream=stream_manifest,
+            cache_dir=(
+                Path(target_dir) / Manifest.CACHE_DIR if manifest_cache else None
+            ),
+        )
         self._metabase = Metabase(
             url=metabase_url,
             api_key=metabase_api_key,
@@ -64,7 +91,16 @@ class DbtMetabase(ModelsMixin, ExposuresMixin, CardsCreator):
             http_timeout=http_timeout,
             http_headers=http_headers,
             http_adapter=http_adapter,
+            session_cache=SessionCache() if metabase_session_cache else None,
+            rate_limiter=RateLimiter(rate=http_rate_limit),
+            # Concurrent calls plus one for prefetching the next page of a listing
+            pool_size=http_pool_size or max(DEFAULT_POOLSIZE, http_concurrency + 1),
+            pool_block=http_pool_block,
+            compress_requests=http_compression,
+            record_path=http_record_path,
         )
+        self._http_concurrency = http_concurrency
+        self._async_metabase: Optional[AsyncMetabase] = None
 
     @property
     def manifest(self) -> Manifest:
@@ -73,3 +109,12 @@ class DbtMetabase(ModelsMixin, ExposuresMixin, CardsCreator):
     @property
     def metabase(self) -> Metabase:
         return self._metabase
+
+    @property
+    def async_metabase(self) -> AsyncMetabase:
+        if self._async_metabase is None:
+            self._async_metabase = AsyncMetabase(
+                metabase=self.metabase,
+                concurrency=self._http_concurrency,
+            )
+        return self._async_metabase
@@ -67,6 +67,10 @@ class _NullValue(str):
     def __eq__(self, other: object) -> bool:
         return other is None
 
+    def __reduce__(self) -> str:
+        # Unpickle as the module-level singleton, so identity checks still hold
+        return "NullValue"
+
 
 NullValue = _NullValue()
 
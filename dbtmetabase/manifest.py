@@ -1,13 +1,34 @@
 from __future__ import annotations
 
+import copy
 import dataclasses as dc
+import functools
+import hashlib
 import json
 import logging
+import os
+import pickle
 import re
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from pathlib import Path
-from typing import Optional, Union, Iterable
-from .format import NullValue
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from ._json import iter_sections
+from .format import Filter, NullValue
 
 _logger = logging.getLogger(__name__)
 
@@ -33,67 +54,413 @@ _MODEL_META_FIELDS = _COMMON_META_FIELDS + [
 
 _DASH_META_FIELDS = ["filters", "filters_order", "tabs", "tabs_order"]
 
+# Bytes of manifest.json hashed at a time
+_DIGEST_CHUNK_SIZE = 1 << 20
+
+# Manifest products persisted in the cache directory
+_PERSISTED_PRODUCTS = ("models", "dashboards")
+# Suffix of cache files being written
+_CACHE_TMP_SUFFIX = ".pickle.tmp"
+
+# Node fields kept when streaming, enough to resolve relationship tests
+_RELATIONSHIP_TEST_FIELDS = [
+    "resource_type",
+    "name",
+    "alias",
+    "column_name",
+    "test_metadata",
+    "depends_on",
+    "refs",
+]
+_RELATIONSHIP_TARGET_FIELDS = ["name", "alias", "identifier", "schema"]
+
+# Concurrent reads of compiled files missing from manifest
+_COMPILED_READ_WORKERS = 16
+
 # Default model schema (only schema in BigQuery)
 DEFAULT_SCHEMA = "PUBLIC"
 
+# Dashboard filter condition: '__filter__.name' is not null
+_CONDITION_PATTERN = re.compile(r"'__filter__\.(\w+)'\s+is\s+not\s+null")
+
+# Distinct card queries memoized across dashboards
+_CONDITIONS_CACHE_SIZE = 1024
+
 # Foreign key constraint: "schema.model (column)" / "model (column)"
 _CONSTRAINT_FK_PARSER = re.compile(r"(?P<model>.+)\s+\((?P<column>.+)\)")
 
 
 def _replace_conditions_in_query(query: str) -> tuple[str, set[str]]:
-    # Define the pattern to match the conditions and capture filter names
-    condition_pattern = re.compile(
-        r"'__filter__\.(\w+)'\s+is\s+not\s+null", re.MULTILINE
-    )
+    card_sql, filters = _rewrite_conditions(query)
+    return card_sql, set(filters)
 
-    # Find all matches and extract filter names
-    matches = condition_pattern.findall(query)
-    filters_found = set(matches)  # Convert list to set to remove duplicates
 
-    # Replace each match individually
-    for filter_name in filters_found:
-        replacement_pattern = re.compile(
-            rf"'__filter__\.{filter_name}'\s+is\s+not\s+null", re.MULTILINE
-        )
-        replacement = f"{{{{ {filter_name} }}}}"
-        query = replacement_pattern.sub(replacement, query)
+@functools.lru_cache(maxsize=_CONDITIONS_CACHE_SIZE)
+def _rewrite_conditions(query: str) -> tuple[str, frozenset[str]]:
+    """Replaces filter conditions with template tags in one scan, memoized by SQL content."""
 
-    return query, filters_found
+    filters = set()
+
+    def replace(match: re.Match) -> str:
+        filter_name = match.group(1)
+        filters.add(filter_name)
+        return f"{{{{ {filter_name} }}}}"
+
+    return _CONDITION_PATTERN.sub(replace, query), frozenset(filters)
+
+
+def _intern(value: Any) -> Any:
+    """Shares one copy of strings repeated across many models and columns."""
+    # Only exact strings can be interned, e.g. not NullValue
+    return sys.intern(value) if type(value) is str else value
+
+
+def _is_relationship_test(node: Mapping) -> bool:
+    return (
+        node.get("resource_type") == "test"
+        and node.get("test_metadata", {}).get("name") == "relationships"
+    )
 
 
 class Manifest:
     """dbt manifest reader."""
 
-    def __init__(self, target_dir: Union[str, Path]):
+    # Default cache directory name under the target directory
+    CACHE_DIR = "dbt-metabase-cache"
+
+    def __init__(
+        self,
+        target_dir: Union[str, Path],
+        stream: bool = False,
+        cache_dir: Optional[Union[str, Path]] = None,
+    ):
         """Reader for compiled dbt manifest.json file.
 
         Args:
-            path (Union[str, Path]): Path to dbt manifest.json (usually under target/).
+            target_dir (Union[str, Path]): Path to dbt target directory with manifest.json.
+            stream (bool, optional): Read manifest.json incrementally instead of loading it whole. Defaults to False.
+            cache_dir (Optional[Union[str, Path]], optional): Directory to persist parsed models and dashboards between runs. Defaults to None.
         """
         self.target_dir = Path(target_dir).expanduser()
         self.path = self.target_dir.joinpath("manifest.json")
+        self.catalog_path = self.target_dir.joinpath("catalog.json")
+        self.stream = stream
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+
+        self._fingerprint: Optional[Fingerprint] = None
+        self._products: dict[str, Any] = {}
+
+    @property
+    def fingerprint(self) -> Fingerprint:
+        """Fingerprint of manifest.json the cached products were read from."""
+        self._refresh()
+        assert self._fingerprint
+        if self._fingerprint.digest is None:
+            self._fingerprint = dc.replace(self._fingerprint, digest=self._digest())
+        return self._fingerprint
 
     def read_dashboards(self) -> list[Dashboard]:
-        with open(self.path, "r", encoding="utf-8") as f:
-            manifest = json.load(f)
+        """Reads dashboard exposures with their cards.
 
-        dashboards = []
-        for dash in manifest["exposures"].values():
-            if dash["type"] != "dashboard":
-                _logger.debug(f"Skipping not dashboard expose {dash['name']}")
-                continue
-            dashboards.append(self._read_dash(dash, manifest))
-        return dashboards
+        Returns:
+            list[Dashboard]: List of dashboards, safe to modify.
+        """
+
+        return copy.deepcopy(self._product("dashboards", self._read_dashboards))
 
-    def read_models(self) -> list[Model]:
+    def read_models(
+        self,
+        database_filter: Optional[Filter] = None,
+        schema_filter: Optional[Filter] = None,
+        model_filter: Optional[Filter] = None,
+        skip_sources: bool = False,
+    ) -> list[Model]:
         """Reads dbt models in Metabase-friendly format.
 
+        Models are parsed once and shared between calls until manifest.json changes.
+        Nodes excluded by filters are skipped before their columns are read.
+
+        Args:
+            database_filter (Optional[Filter], optional): Filter models by database. Defaults to None.
+            schema_filter (Optional[Filter], optional): Filter models by schema. Defaults to None.
+            model_filter (Optional[Filter], optional): Filter models by name. Defaults to None.
+            skip_sources (bool, optional): Exclude dbt sources. Defaults to False.
+
         Returns:
             list[Model]: List of dbt models in Metabase-friendly format.
         """
 
-        with open(self.path, "r", encoding="utf-8") as f:
-            manifest = json.load(f)
+        selection = _Selection(
+            database_filter, schema_filter, model_filter, skip_sources
+        )
+        if not selection:
+            return list(self._product("models", self._read_models))
+
+        if self._has_product("models"):
+            # Filtering already read models is cheaper than reading them again
+            return [
+                m
+                for m in self._product("models", self._read_models)
+                if selection.match(m.group, m.database, m.schema, m.name)
+            ]
+
+        return list(
+            self._product(
+                f"models{selection.key}",
+                lambda: self._read_models(selection),
+            )
+        )
+
+    def read_refs(self) -> dict[str, str]:
+        """Reads dbt references by model name, e.g. "ref('orders')".
+
+        Returns:
+            dict[str, str]: Mapping of model names to references.
+        """
+
+        return dict(
+            self._product(
+                "refs",
+                lambda: {m.name: m.ref for m in self.read_models() if m.ref},
+            )
+        )
+
+    def read_catalog(
+        self,
+        unique_ids: Optional[Collection[str]] = None,
+    ) -> dict[str, list[CatalogColumn]]:
+        """Reads physical columns of models from catalog.json generated by "dbt docs generate".
+
+        Unlike manifest.json, the catalog lists every column in the database, including
+        undocumented ones, with their types and positions.
+
+        Args:
+            unique_ids (Optional[Collection[str]], optional): Only read columns of these models. Defaults to None.
+
+        Returns:
+            dict[str, list[CatalogColumn]]: Columns by model unique ID in table order, empty if catalog.json does not exist.
+        """
+
+        if not self.catalog_path.exists():
+            _logger.warning("Catalog '%s' not found", self.catalog_path)
+            return {}
+
+        catalog: dict[str, list[CatalogColumn]] = {}
+        with open(self.catalog_path, "r", encoding="utf-8") as f:
+            for _, unique_id, node in iter_sections(f, (Group.nodes, Group.sources)):
+                if unique_ids is not None and unique_id not in unique_ids:
+                    continue
+
+                columns = [
+                    CatalogColumn(
+                        name=_intern(column["name"]),
+                        type=_intern(column.get("type")),
+                        index=column.get("index", 0),
+                    )
+                    for column in node.get("columns", {}).values()
+                ]
+                columns.sort(key=lambda c: c.index)
+                catalog[unique_id] = columns
+
+        return catalog
+
+    def diff_models(self, state: Manifest) -> dict[str, Optional[set[str]]]:
+        """Compares models against a previous manifest, similar to dbt state:modified.
+
+        Args:
+            state (Manifest): Manifest from a previous run.
+
+        Returns:
+            dict[str, Optional[set[str]]]: Unique IDs of new or modified models, mapped to names of
+                modified columns or None when the whole model changed (attributes, columns added,
+                removed or reordered).
+        """
+
+        state_models = {m.unique_id: m for m in state.read_models()}
+
+        modified: dict[str, Optional[set[str]]] = {}
+        for model in self.read_models():
+            unique_id = str(model.unique_id)
+            state_model = state_models.get(unique_id)
+
+            if state_model is None or dc.replace(model, columns=[]) != dc.replace(
+                state_model, columns=[]
+            ):
+                modified[unique_id] = None
+                continue
+
+            state_columns = {c.name: c for c in state_model.columns}
+            if [c.name for c in model.columns] != list(state_columns):
+                modified[unique_id] = None
+                continue
+
+            columns = {c.name for c in model.columns if c != state_columns[c.name]}
+            if columns:
+                modified[unique_id] = columns
+
+        return modified
+
+    def _refresh(self):
+        """Drops cached products if manifest.json has changed since it was read.
+
+        Contents are only hashed to tell whether a modified file actually changed, when
+        the digest of the previous one is known, e.g. for the on-disk cache.
+        """
+
+        stat = self.path.stat()
+        if self._fingerprint and self._fingerprint.stat == (
+            stat.st_mtime_ns,
+            stat.st_size,
+        ):
+            return
+
+        digest = None
+        if self._fingerprint and self._fingerprint.digest is not None:
+            digest = self._digest()
+
+        if (
+            not self._fingerprint
+            or digest is None
+            or self._fingerprint.digest != digest
+        ):
+            if self._fingerprint:
+                _logger.debug("Manifest '%s' changed, reading again", self.path)
+            self._products.clear()
+
+        self._fingerprint = Fingerprint(
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            digest=digest,
+        )
+
+    def _digest(self) -> str:
+        digest = hashlib.sha256()
+        with open(self.path, "rb") as f:
+            for chunk in iter(lambda: f.read(_DIGEST_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def clear_cache(self):
+        """Removes parsed products persisted in the cache directory.
+
+        Works whether or not the cache is used, defaulting to its directory under target.
+        """
+
+        cache_dir = self.cache_dir or self.target_dir / self.CACHE_DIR
+        if cache_dir.exists():
+            # Temporary files are left behind by interrupted writes
+            for pattern in ("*.pickle", f"*{_CACHE_TMP_SUFFIX}"):
+                for path in cache_dir.glob(pattern):
+                    path.unlink(missing_ok=True)
+            _logger.info("Manifest cache '%s' cleared", cache_dir)
+
+    def _has_product(self, key: str) -> bool:
+        """Checks whether a product can be returned without reading manifest.json."""
+
+        self._refresh()
+        if key in self._products:
+            return True
+
+        path = self._cache_path(key) if key in _PERSISTED_PRODUCTS else None
+        return bool(path and path.exists())
+
+    def _product(self, key: str, read: Callable[[], Any]) -> Any:
+        """Returns a product derived from manifest.json, reading it only once."""
+
+        self._refresh()
+        if key not in self._products:
+            persisted = key in _PERSISTED_PRODUCTS
+            product = self._read_cache(key) if persisted else None
+            if product is None:
+                product = read()
+                if persisted:
+                    self._write_cache(key, product)
+            self._products[key] = product
+        return self._products[key]
+
+    def _cache_path(self, key: str) -> Optional[Path]:
+        if not self.cache_dir:
+            return None
+
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from . import __version__
+
+        return self.cache_dir / f"{key}-{__version__}-{self.fingerprint.digest}.pickle"
+
+    def _read_cache(self, key: str) -> Any:
+        path = self._cache_path(key)
+        if not path or not path.exists():
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                product = pickle.load(f)
+        except (
+            OSError,
+            EOFError,
+            pickle.UnpicklingError,
+            AttributeError,
+            TypeError,
+        ) as e:
+            _logger.warning("Ignoring unreadable manifest cache '%s': %s", path, e)
+            return None
+
+        _logger.debug("Read %s from manifest cache '%s'", key, path)
+        return product
+
+    def _write_cache(self, key: str, product: Any):
+        path = self._cache_path(key)
+        if not path:
+            return
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=path.parent,
+                prefix=f"{key}-",
+                suffix=_CACHE_TMP_SUFFIX,
+                delete=False,
+            ) as f:
+                pickle.dump(product, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f.name, path)
+        except OSError as e:
+            _logger.warning("Unable to write manifest cache '%s': %s", path, e)
+            return
+
+        # Entries for previous manifests or versions are never read again
+        for stale_path in path.parent.glob(f"{key}-*.pickle"):
+            if stale_path != path:
+                stale_path.unlink(missing_ok=True)
+
+    def _load(self) -> Mapping[str, Any]:
+        """Returns parsed manifest.json, shared between all products."""
+
+        def parse() -> Mapping[str, Any]:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return MappingProxyType(json.load(f))
+
+        return self._product("manifest", parse)
+
+    def _read_dashboards(self) -> list[Dashboard]:
+        if self.stream:
+            return list(self.iter_dashboards())
+
+        manifest = self._load()
+
+        dashes = []
+        for dash in manifest["exposures"].values():
+            if dash["type"] != "dashboard":
+                _logger.debug(f"Skipping not dashboard expose {dash['name']}")
+                continue
+            dashes.append(dash)
+        return list(self._read_dashes(dashes, manifest["nodes"]))
+
+    def _read_models(self, selection: Optional[_Selection] = None) -> list[Model]:
+        if self.stream:
+            return list(self._iter_models(selection))
+
+        manifest = self._load()
+        relationships = self._product("relationships", self._read_relationships)
 
         models: list[Model] = []
 
@@ -106,22 +473,182 @@ class Manifest:
                 _logger.debug("Skipping ephemeral model '%s'", name)
                 continue
 
-            models.append(self._read_model(manifest, node, Group.nodes))
+            if selection and not selection.match_node(Group.nodes, node):
+                continue
+
+            models.append(
+                self._read_model(
+                    node,
+                    Group.nodes,
+                    relationships.get(node["unique_id"], {}),
+                )
+            )
 
         for node in manifest["sources"].values():
             if node["resource_type"] != "source":
                 continue
 
+            if selection and not selection.match_node(Group.sources, node):
+                continue
+
+            # Relationship tests are never looked up for sources
             models.append(
-                self._read_model(manifest, node, Group.sources, node["source_name"])
+                self._read_model(node, Group.sources, {}, node["source_name"])
             )
 
         return models
 
-    def _read_dash(self, manifest_dash: dict, manifest: dict):
+    def iter_models(self) -> Iterator[Model]:
+        """Streams dbt models from manifest.json without loading it whole.
+
+        The file is read twice: first to index relationship tests and their targets,
+        then to build models one node at a time.
+
+        Returns:
+            Iterator[Model]: dbt models in Metabase-friendly format.
+        """
+
+        return self._iter_models()
+
+    def _iter_models(self, selection: Optional[_Selection] = None) -> Iterator[Model]:
+        relationships = self._product("relationships", self._read_relationships)
+
+        for section, _, node in self._stream(Group.nodes, Group.sources):
+            if section == Group.nodes:
+                if node["resource_type"] != "model":
+                    continue
+
+                if node["config"]["materialized"] == "ephemeral":
+                    _logger.debug("Skipping ephemeral model '%s'", node["name"])
+                    continue
+
+                if selection and not selection.match_node(Group.nodes, node):
+                    continue
+
+                yield self._read_model(
+                    node,
+                    Group.nodes,
+                    relationships.get(node["unique_id"], {}),
+                )
+
+            elif node["resource_type"] == "source":
+                if selection and not selection.match_node(Group.sources, node):
+                    continue
+
+                # Relationship tests are never looked up for sources
+                yield self._read_model(node, Group.sources, {}, node["source_name"])
+
+    def iter_dashboards(self) -> Iterator[Dashboard]:
+        """Streams dashboard exposures from manifest.json without loading it whole.
+
+        Returns:
+            Iterator[Dashboard]: Dashboards with their cards.
+        """
+
+        dashes = []
+        for _, _, dash in self._stream("exposures"):
+            if dash["type"] != "dashboard":
+                _logger.debug(f"Skipping not dashboard expose {dash['name']}")
+                continue
+            dashes.append(dash)
+
+        depends_on = {n for dash in dashes for n in dash["depends_on"]["nodes"]}
+        nodes = {}
+        if depends_on:
+            for _, unique_id, node in self._stream(Group.nodes):
+                if unique_id in depends_on:
+                    nodes[unique_id] = node
+
+        yield from self._read_dashes(dashes, nodes)
+
+    def _stream(self, *sections: str) -> Iterator[tuple[str, str, dict]]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            yield from iter_sections(f, sections)
+
+    def _stream_relationships(self) -> dict[str, dict[str, dict[str, str]]]:
+        """Indexes relationships by model from a streamed manifest.
+
+        Only relationship tests and the fields needed to resolve their targets are kept.
+        """
+
+        targets: dict[str, dict] = {}
+        tests: list[dict] = []
+
+        for _, unique_id, node in self._stream(Group.nodes):
+            if _is_relationship_test(node):
+                tests.append(
+                    {k: node[k] for k in _RELATIONSHIP_TEST_FIELDS if k in node}
+                )
+            else:
+                targets[unique_id] = {
+                    k: node[k] for k in _RELATIONSHIP_TARGET_FIELDS if k in node
+                }
+
+        return self._index_relationships(tests, targets)
+
+    def _read_dashes(
+        self,
+        manifest_dashes: list[dict],
+        nodes: Mapping[str, dict],
+    ) -> Iterator[Dashboard]:
+        # Models are often shared between dashboards, their SQL is read once
+        compiled = self._read_compiled_sql(
+            [
+                nodes[node_name]
+                for node_name in dict.fromkeys(
+                    n for dash in manifest_dashes for n in dash["depends_on"]["nodes"]
+                )
+            ]
+        )
+
+        for manifest_dash in manifest_dashes:
+            yield self._read_dash(manifest_dash, nodes, compiled)
+
+    def _read_compiled_sql(self, manifest_models: list[Mapping]) -> dict[str, str]:
+        """Reads compiled SQL by node ID, from the manifest or compiled files when missing."""
+
+        compiled = {}
+        missing = []
+        for manifest_model in manifest_models:
+            # compiled_sql was renamed in manifest v7
+            sql = manifest_model.get(
+                "compiled_code", manifest_model.get("compiled_sql")
+            )
+            if sql is not None:
+                compiled[manifest_model["unique_id"]] = sql
+            else:
+                missing.append(manifest_model)
+
+        if missing:
+            _logger.debug("Reading %d compiled files", len(missing))
+            # Small reads are latency-bound, especially on network filesystems
+            with ThreadPoolExecutor(max_workers=_COMPILED_READ_WORKERS) as executor:
+                for manifest_model, sql in zip(
+                    missing,
+                    executor.map(self._read_compiled_file, missing),
+                ):
+                    compiled[manifest_model["unique_id"]] = sql
+
+        return compiled
+
+    def _read_compiled_file(self, manifest_model: Mapping) -> str:
+        compile_path = self.target_dir.joinpath(
+            "compiled",
+            manifest_model["package_name"],
+            manifest_model["original_file_path"],
+        )
+        with open(compile_path, encoding="utf-8") as f:
+            return f.read()
+
+    def _read_dash(
+        self,
+        manifest_dash: dict,
+        nodes: Mapping[str, dict],
+        compiled: Mapping[str, str],
+    ):
         cards = {}
         for node_name in manifest_dash["depends_on"]["nodes"]:
-            card = self._read_card(manifest["nodes"][node_name])
+            card = self._read_card(nodes[node_name], compiled[node_name])
             cards.update({card.name: card})
 
         meta = self._scan_fields(
@@ -140,19 +667,14 @@ class Manifest:
 
         return Dashboard(
             name=manifest_dash["name"],
-            description=manifest_dash.get('description'),
+            description=manifest_dash.get("description"),
             cards=cards,
             filters=filters,
-            **meta
+            **meta,
         )
 
-    def _read_card(self, manifest_model) -> Card:
+    def _read_card(self, manifest_model: Mapping, compile_sql: str) -> Card:
         path = manifest_model["original_file_path"]
-        compile_path = self.target_dir.joinpath(
-            "compiled", manifest_model["package_name"], path
-        )
-        with open(compile_path) as f:
-            compile_sql = f.read()
         card_sql, filters = _replace_conditions_in_query(compile_sql)
 
         return Card(
@@ -166,17 +688,15 @@ class Manifest:
 
     def _read_model(
         self,
-        manifest: dict,
         manifest_model: dict,
         group: Group,
+        relationships: Mapping[str, dict[str, str]],
         source: Optional[str] = None,
     ) -> Model:
-        database = manifest_model["database"]
-        schema = manifest_model["schema"]
+        database = _intern(manifest_model["database"])
+        schema = _intern(manifest_model["schema"])
         unique_id = manifest_model["unique_id"]
 
-        relationships = self._read_relationships(manifest, group, unique_id)
-
         columns = [
             self._read_column(column, schema, relationships.get(column["name"]))
             for column in manifest_model.get("columns", {}).values()
@@ -194,7 +714,7 @@ class Manifest:
             columns=columns,
             unique_id=unique_id,
             source=source,
-            tags=manifest_model.get("tags", []),
+            tags=tuple(_intern(t) for t in manifest_model.get("tags", ())),
             **self._scan_fields(
                 manifest_model.get("meta", {}),
                 fields=_MODEL_META_FIELDS,
@@ -209,7 +729,7 @@ class Manifest:
         relationship: Optional[dict],
     ) -> Column:
         column = Column(
-            name=manifest_column.get("name", ""),
+            name=_intern(manifest_column.get("name", "")),
             description=manifest_column.get("description"),
             **self._scan_fields(
                 manifest_column.get("meta", {}),
@@ -227,103 +747,142 @@ class Manifest:
 
         return column
 
-    def _read_relationships(
+    def _read_relationships(self) -> dict[str, dict[str, dict[str, str]]]:
+        """Indexes foreign key targets from relationship tests by model and column."""
+
+        if self.stream:
+            return self._stream_relationships()
+
+        nodes = self._load()["nodes"]
+        return self._index_relationships(
+            tests=(node for node in nodes.values() if _is_relationship_test(node)),
+            nodes=nodes,
+        )
+
+    def _index_relationships(
         self,
-        manifest: dict,
-        group: Group,
-        unique_id: str,
-    ) -> dict[str, dict[str, str]]:
-        relationships = {}
+        tests: Iterable[Mapping],
+        nodes: Mapping[str, Mapping],
+    ) -> dict[str, dict[str, dict[str, str]]]:
+        """Resolves relationship tests in one pass, so reading a model is a lookup.
 
-        for child_id in manifest["child_map"][unique_id]:
-            child = manifest.get(group, {}).get(child_id, {})
-            child_name = child.get("alias", child.get("name"))
+        Args:
+            tests (Iterable[Mapping]): Relationship test nodes.
+            nodes (Mapping[str, Mapping]): Nodes that can be tested or referenced.
 
-            if (
-                child.get("resource_type") == "test"
-                and child.get("test_metadata", {}).get("name") == "relationships"
-            ):
-                # To get the name of the foreign table, we could use child[test_metadata][kwargs][to], which
-                # would return the ref() written in the test, but if the model has an alias, that's not enough.
-                # Using child[depends_on][nodes] and excluding the current model is better.
-
-                # Nodes contain at most two tables: referenced model and current model (optional).
-                depends_on_nodes = list(child["depends_on"][group])
-
-                # Relationships on disabled models mention them in refs but not depends_on,
-                # which confuses the filtering logic that follows.
-                depends_on_names = {n.split(".")[-1] for n in depends_on_nodes}
-                mismatched_refs = []
-                for ref in child["refs"]:
-                    ref_name = ""
-                    if isinstance(ref, dict):  # current manifest
-                        ref_name = ref["name"]
-                    elif isinstance(ref, list):  # old manifest
-                        ref_name = ref[0]
-                    if ref_name not in depends_on_names:
-                        mismatched_refs.append(ref_name)
-
-                if mismatched_refs:
-                    _logger.debug(
-                        "Mismatched refs %s with depends_on for relationship '%s', skipping",
-                        mismatched_refs,
-                        child_name,
-                    )
-                    continue
+        Returns:
+            dict[str, dict[str, dict[str, str]]]: Foreign key targets by model unique ID and column name.
+        """
 
-                if len(depends_on_nodes) > 2:
-                    _logger.warning(
-                        "Unexpected %d depends_on for relationship '%s' instead of <=2, skipping",
-                        len(depends_on_nodes),
-                        child_name,
-                    )
-                    continue
+        relationships: dict[str, dict[str, dict[str, str]]] = {}
 
-                # Skip the incoming relationship tests, in which the fk_target_table is the model currently being read.
-                # Otherwise, the primary key of the current model would be (incorrectly) determined to be FK.
-                if len(depends_on_nodes) == 2 and depends_on_nodes[1] != unique_id:
-                    _logger.debug(
-                        "Circular dependency '%s' for relationship '%s', skipping",
-                        depends_on_nodes[1],
-                        child_name,
-                    )
+        for test in tests:
+            # Same as walking child_map of every node the test depends on
+            for unique_id in dict.fromkeys(test["depends_on"]["nodes"]):
+                if unique_id not in nodes:
                     continue
 
-                # Remove the current model from the list, ensuring it works for self-referencing models.
-                if len(depends_on_nodes) == 2 and unique_id in depends_on_nodes:
-                    depends_on_nodes.remove(unique_id)
+                relationship = self._read_relationship(
+                    child=test,
+                    unique_id=unique_id,
+                    nodes=nodes,
+                )
+                if relationship:
+                    column_name, fk_target = relationship
+                    relationships.setdefault(unique_id, {})[column_name] = fk_target
 
-                if len(depends_on_nodes) != 1:
-                    _logger.warning(
-                        "Got %d dependencies for '%s' instead of 1, skipping",
-                        len(depends_on_nodes),
-                        unique_id,
-                    )
-                    continue
+        return relationships
 
-                depends_on_id = depends_on_nodes[0]
+    def _read_relationship(
+        self,
+        child: Mapping,
+        unique_id: str,
+        nodes: Mapping[str, Mapping],
+    ) -> Optional[tuple[str, dict[str, str]]]:
+        """Resolves foreign key target of a child relationship test, if it is one."""
+
+        if not _is_relationship_test(child):
+            return None
+
+        child_name = child.get("alias", child.get("name"))
+
+        # To get the name of the foreign table, we could use child[test_metadata][kwargs][to], which
+        # would return the ref() written in the test, but if the model has an alias, that's not enough.
+        # Using child[depends_on][nodes] and excluding the current model is better.
+
+        # Nodes contain at most two tables: referenced model and current model (optional).
+        depends_on_nodes = list(child["depends_on"]["nodes"])
+
+        # Relationships on disabled models mention them in refs but not depends_on,
+        # which confuses the filtering logic that follows.
+        depends_on_names = {n.split(".")[-1] for n in depends_on_nodes}
+        mismatched_refs = []
+        for ref in child["refs"]:
+            ref_name = ""
+            if isinstance(ref, dict):  # current manifest
+                ref_name = ref["name"]
+            elif isinstance(ref, list):  # old manifest
+                ref_name = ref[0]
+            if ref_name not in depends_on_names:
+                mismatched_refs.append(ref_name)
+
+        if mismatched_refs:
+            _logger.debug(
+                "Mismatched refs %s with depends_on for relationship '%s', skipping",
+                mismatched_refs,
+                child_name,
+            )
+            return None
 
-                fk_target_model = manifest[group].get(depends_on_id, {})
-                fk_target_table = fk_target_model.get(
-                    "alias",
-                    fk_target_model.get("identifier", fk_target_model.get("name")),
-                )
-                if not fk_target_table:
-                    _logger.debug("Cannot resolve dependency for '%s'", depends_on_id)
-                    continue
+        if len(depends_on_nodes) > 2:
+            _logger.warning(
+                "Unexpected %d depends_on for relationship '%s' instead of <=2, skipping",
+                len(depends_on_nodes),
+                child_name,
+            )
+            return None
+
+        # Skip the incoming relationship tests, in which the fk_target_table is the model currently being read.
+        # Otherwise, the primary key of the current model would be (incorrectly) determined to be FK.
+        if len(depends_on_nodes) == 2 and depends_on_nodes[1] != unique_id:
+            _logger.debug(
+                "Circular dependency '%s' for relationship '%s', skipping",
+                depends_on_nodes[1],
+                child_name,
+            )
+            return None
 
-                fk_target_schema = manifest[group][depends_on_id].get(
-                    "schema", DEFAULT_SCHEMA
-                )
-                fk_target_table = f"{fk_target_schema}.{fk_target_table}"
-                fk_target_field = child["test_metadata"]["kwargs"]["field"].strip('"')
+        # Remove the current model from the list, ensuring it works for self-referencing models.
+        if len(depends_on_nodes) == 2 and unique_id in depends_on_nodes:
+            depends_on_nodes.remove(unique_id)
 
-                relationships[child["column_name"]] = {
-                    "fk_target_table": fk_target_table,
-                    "fk_target_field": fk_target_field,
-                }
+        if len(depends_on_nodes) != 1:
+            _logger.warning(
+                "Got %d dependencies for '%s' instead of 1, skipping",
+                len(depends_on_nodes),
+                unique_id,
+            )
+            return None
 
-        return relationships
+        depends_on_id = depends_on_nodes[0]
+
+        fk_target_model = nodes.get(depends_on_id, {})
+        fk_target_table = fk_target_model.get(
+            "alias",
+            fk_target_model.get("identifier", fk_target_model.get("name")),
+        )
+        if not fk_target_table:
+            _logger.debug("Cannot resolve dependency for '%s'", depends_on_id)
+            return None
+
+        fk_target_schema = fk_target_model.get("schema", DEFAULT_SCHEMA)
+        fk_target_table = f"{fk_target_schema}.{fk_target_table}"
+        fk_target_field = child["test_metadata"]["kwargs"]["field"].strip('"')
+
+        return child["column_name"], {
+            "fk_target_table": fk_target_table,
+            "fk_target_field": fk_target_field,
+        }
 
     def _set_column_relationship(
         self,
@@ -379,8 +938,10 @@ class Manifest:
             fk_target_table_path.insert(0, schema)
 
         column.semantic_type = "type/FK"
-        column.fk_target_table = ".".join([x.strip('"') for x in fk_target_table_path])
-        column.fk_target_field = fk_target_field.strip('"')
+        column.fk_target_table = _intern(
+            ".".join([x.strip('"') for x in fk_target_table_path])
+        )
+        column.fk_target_field = _intern(fk_target_field.strip('"'))
         _logger.debug(
             "Relation from '%s' to '%s.%s'",
             column.name,
@@ -405,16 +966,63 @@ class Manifest:
         for field in fields:
             if f"{ns}.{field}" in t:
                 value = t[f"{ns}.{field}"]
-                vals[field] = value if value is not None else NullValue
+                vals[field] = _intern(value) if value is not None else NullValue
         return vals
 
 
+@dc.dataclass(frozen=True)
+class _Selection:
+    """Model selection applied to manifest nodes before they are read."""
+
+    database_filter: Optional[Filter] = None
+    schema_filter: Optional[Filter] = None
+    model_filter: Optional[Filter] = None
+    skip_sources: bool = False
+
+    def __bool__(self) -> bool:
+        filters = [self.database_filter, self.schema_filter, self.model_filter]
+        return self.skip_sources or any(f and (f.include or f.exclude) for f in filters)
+
+    @property
+    def key(self) -> str:
+        filters = [self.database_filter, self.schema_filter, self.model_filter]
+        return repr(
+            (
+                [(f.include, f.exclude) if f else None for f in filters],
+                self.skip_sources,
+            )
+        )
+
+    def match(self, group: Group, database: str, schema: str, name: str) -> bool:
+        return (
+            (not self.skip_sources or group != Group.sources)
+            and (not self.database_filter or self.database_filter.match(database))
+            and (not self.schema_filter or self.schema_filter.match(schema))
+            and (not self.model_filter or self.model_filter.match(name))
+        )
+
+    def match_node(self, group: Group, node: Mapping) -> bool:
+        return self.match(group, node["database"], node["schema"], node["name"])
+
+
+@dc.dataclass(frozen=True)
+class Fingerprint:
+    mtime_ns: int
+    size: int
+    # Only computed when needed, hashing reads the whole file
+    digest: Optional[str] = None
+
+    @property
+    def stat(self) -> tuple[int, int]:
+        return self.mtime_ns, self.size
+
+
 class Group(str, Enum):
     nodes = "nodes"
     sources = "sources"
 
 
-@dc.dataclass
+@dc.dataclass(slots=True)
 class Column:
     name: str
     description: Optional[str] = None
@@ -428,10 +1036,15 @@ class Column:
     fk_target_table: Optional[str] = None
     fk_target_field: Optional[str] = None
 
-    meta_fields: dict = dc.field(default_factory=dict)
 
+@dc.dataclass(frozen=True, slots=True)
+class CatalogColumn:
+    name: str
+    type: Optional[str] = None
+    index: int = 0
 
-@dc.dataclass
+
+@dc.dataclass(slots=True)
 class Model:
     database: str
     schema: str
@@ -447,10 +1060,15 @@ class Model:
 
     unique_id: Optional[str] = None
     source: Optional[str] = None
-    tags: list[str] = dc.field(default_factory=list)
+    tags: Sequence[str] = ()
 
     columns: list[Column] = dc.field(default_factory=list)
 
+    def __post_init__(self):
+        # Tuples share one empty instance instead of a list per model
+        if not isinstance(self.tags, tuple):
+            self.tags = tuple(self.tags)
+
     @property
     def ref(self) -> Optional[str]:
         if self.group == Group.nodes:
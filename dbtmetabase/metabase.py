@@ -1,14 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import gzip
 import logging
-import json
-from typing import Any, Optional, Union
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterator,
+    MutableMapping,
+    NamedTuple,
+    Optional,
+    TypeVar,
+    Union,
+)
 
 import requests
-from requests.adapters import HTTPAdapter, Retry
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter, Retry
 
+from ._json import JSONCodec, default_codec
+from ._limits import THROTTLE_STATUSES, RateLimiter
+from ._sessions import SessionCache
+from ._transport import RecordingAdapter
 from .errors import ArgumentError
 
 _logger = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# Header authenticating requests with a session token
+_SESSION_HEADER = "X-Metabase-Session"
+
+# Attributes of tables listed from database metadata, rather than whole copies
+_LISTED_TABLE_KEYS = ("id", "name", "schema", "db_id")
+
+# Default number of GET responses kept by each client
+DEFAULT_CACHE_SIZE = 1024
+
+# Default number of items requested per page from list endpoints
+DEFAULT_PAGE_SIZE = 500
+
+# Request bodies smaller than this are sent uncompressed, gzip wouldn't pay off
+COMPRESS_MIN_SIZE = 16 * 1024
+
+# Resource types whose cached responses embed another type, e.g. table metadata with fields
+_CACHE_DEPENDENTS = {
+    "database": ("table",),
+    "field": ("table",),
+    "card": ("dashboard",),
+}
+
+
+def _resource(path: str) -> tuple[str, Optional[str]]:
+    """Parses resource type and ID from an API path, e.g. ("table", "1") for /api/table/1/fields."""
+    toks = path.strip("/").split("/")
+    return toks[1] if len(toks) > 1 else "", toks[2] if len(toks) > 2 else None
+
+
+class _CacheKey(NamedTuple):
+    resource: tuple[str, Optional[str]]
+    path: str
+    params: tuple
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
 
 class Metabase:
 
@@ -24,10 +90,34 @@ class Metabase:
         http_timeout: int,
         http_headers: Optional[dict],
         http_adapter: Optional[HTTPAdapter],
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        json_codec: Optional[JSONCodec] = None,
+        session_cache: Optional[SessionCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        pool_size: int = DEFAULT_POOLSIZE,
+        pool_block: bool = False,
+        compress_requests: bool = False,
+        record_path: Optional[Union[str, Path]] = None,
     ):
         self.url = url.rstrip("/")
 
+        self.json_codec = json_codec or default_codec()
+        self.rate_limiter = rate_limiter or RateLimiter()
+
         self.http_timeout = http_timeout
+        self.compress_requests = compress_requests
+
+        # Responses of idempotent GETs by resource, least recently used first
+        self._cache: OrderedDict[_CacheKey, bytes] = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._cache_lock = threading.Lock()
+
+        # Tables of databases whose metadata was retrieved, reused for table listings
+        self._database_tables: dict[str, list[dict]] = {}
+        # Last sync durations by database, none where task history is not accessible
+        self._sync_durations: dict[str, Optional[float]] = {}
 
         self.session = requests.Session()
         self.session.verify = not skip_verify
@@ -36,67 +126,253 @@ class Metabase:
         if http_headers:
             self.session.headers.update(http_headers)
 
-        self.session.mount(
-            self.url,
-            http_adapter or HTTPAdapter(max_retries=Retry(total=3, backoff_factor=1)),
+        adapter = http_adapter or HTTPAdapter(
+            # Connections beyond the pool size are closed after use, not kept alive
+            pool_maxsize=pool_size,
+            pool_block=pool_block,
+            # Throttling is retried by the rate limiter, which paces all threads
+            max_retries=Retry(
+                total=3,
+                backoff_factor=1,
+                respect_retry_after_header=False,
+            ),
         )
+        if record_path:
+            _logger.info("Recording Metabase API responses to '%s'", record_path)
+            adapter = RecordingAdapter(record_path, adapter)
+        self.session.mount(self.url, adapter)
+
+        # Credentials to log in again when the session expires
+        self._credentials: Optional[dict[str, str]] = None
+        self._session_cache = session_cache
+        self._login_lock = threading.Lock()
 
         if api_key:
             self.session.headers["X-API-KEY"] = api_key
         elif username and password:
-            session = dict(
-                self._api(
-                    method="post",
-                    path="/api/session",
-                    json={"username": username, "password": password},
-                )
-            )
-            self.session.headers["X-Metabase-Session"] = str(session["id"])
+            self._credentials = {"username": username, "password": password}
+
+            token = session_cache.get(self.url, username) if session_cache else None
+            if token:
+                # Validated by the first request, which logs in again if rejected
+                _logger.debug("Reusing cached Metabase session")
+                self.session.headers[_SESSION_HEADER] = token
+            else:
+                self._login()
         elif session_id:
             _logger.warning(
                 "Metabase session ID is deprecated and will be removed in future, use API key or username/password instead"
             )
-            self.session.headers["X-Metabase-Session"] = session_id
+            self.session.headers[_SESSION_HEADER] = session_id
         else:
             raise ArgumentError("Metabase API key or username/password required")
 
         _logger.info("Metabase session established")
 
+    def _login(self, stale_token: Optional[str] = None):
+        """Logs in with credentials, unless another thread already replaced the stale token."""
+
+        assert self._credentials
+        with self._login_lock:
+            if stale_token and self.session.headers.get(_SESSION_HEADER) != stale_token:
+                return
+
+            session = dict(
+                self._request(
+                    method="post",
+                    path="/api/session",
+                    json=self._credentials,
+                )
+            )
+            token = str(session["id"])
+            self.session.headers[_SESSION_HEADER] = token
+
+            if self._session_cache:
+                self._session_cache.set(self.url, self._credentials["username"], token)
+
+    def cache_info(self) -> CacheInfo:
+        """Reports effectiveness of the response cache, similar to functools.lru_cache."""
+        with self._cache_lock:
+            return CacheInfo(
+                hits=self._cache_hits,
+                misses=self._cache_misses,
+                maxsize=self._cache_size,
+                currsize=len(self._cache),
+            )
+
+    def cache_clear(self):
+        """Drops all cached responses."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._database_tables.clear()
+            self._sync_durations.clear()
+
     def _api(
         self,
         method: str,
         path: str,
         params: Optional[dict[str, Any]] = None,
+        cache: bool = False,
         **kwargs,
     ) -> Union[dict, list]:
-        """Raw API call."""
+        """API call, served from the response cache for opted-in GETs.
+
+        Writes invalidate cached responses of the resource they modify and its dependents.
+        """
 
         if params:
             for key, value in params.items():
                 if isinstance(value, bool):
                     params[key] = str(value).lower()
 
-        response = self.session.request(
-            method=method,
-            url=f"{self.url}{path}",
-            params=params,
-            timeout=self.http_timeout,
-            **kwargs,
+        if method != "get":
+            self._invalidate(path)
+            return self._request(method, path, params, **kwargs)
+
+        if not cache or self._cache_size <= 0:
+            return self._request(method, path, params, **kwargs)
+
+        cache_key = _CacheKey(
+            resource=_resource(path),
+            path=path,
+            params=tuple(
+                (k, tuple(v) if isinstance(v, list) else v)
+                for k, v in sorted((params or {}).items())
+            ),
         )
 
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                self._cache_hits += 1
+            else:
+                self._cache_misses += 1
+
+        # Decoding a fresh copy keeps cached responses safe from callers modifying them
+        if cached is not None:
+            return self.json_codec.decode(cached)
+
+        response = self._request(method, path, params, **kwargs)
+
+        with self._cache_lock:
+            self._cache[cache_key] = self.json_codec.dumps(response)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+        return response
+
+    def _invalidate(self, path: str):
+        """Drops cached responses affected by a write to the path."""
+
+        resource_type, resource_id = _resource(path)
+        dependents = _CACHE_DEPENDENTS.get(resource_type, ())
+
+        with self._cache_lock:
+            for key in list(self._cache):
+                cached_type, cached_id = key.resource
+                if cached_type in dependents or (
+                    cached_type == resource_type
+                    and (resource_id is None or cached_id in (None, resource_id))
+                ):
+                    del self._cache[key]
+
+            if resource_type == "database":
+                if resource_id is None:
+                    self._database_tables.clear()
+                else:
+                    self._database_tables.pop(resource_id, None)
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict[str, Any]] = None,
+        unwrap: bool = True,
+        log_errors: bool = True,
+        **kwargs,
+    ) -> Union[dict, list]:
+        """Raw API call, unwrapping paginated list responses unless disabled.
+
+        Failures are logged as errors, or only for debugging when the caller expects them.
+        """
+
+        if "json" in kwargs:
+            data = self.json_codec.dumps(kwargs.pop("json"))
+            headers = {"Content-Type": "application/json"}
+            if self.compress_requests and len(data) >= COMPRESS_MIN_SIZE:
+                data = gzip.compress(data, compresslevel=6)
+                headers["Content-Encoding"] = "gzip"
+            kwargs["data"] = data
+            kwargs["headers"] = {**headers, **kwargs.get("headers", {})}
+
+        token = self.session.headers.get(_SESSION_HEADER)
+        response = self._send(method=method, path=path, params=params, **kwargs)
+
+        if response.status_code == 401 and self._credentials and path != "/api/session":
+            _logger.info("Metabase session expired, logging in again")
+            self._login(stale_token=str(token))
+            response = self._send(method=method, path=path, params=params, **kwargs)
+
         try:
             response.raise_for_status()
         except requests.exceptions.HTTPError:
-            _logger.error("HTTP request failed: %s", response.text)
+            _logger.log(
+                logging.ERROR if log_errors else logging.DEBUG,
+                "HTTP request failed: %s",
+                response.text,
+            )
             raise
 
-        response_json = response.json()
-        if "data" in response_json:
+        # Decoding bytes skips the text copy made by response.json()
+        response_json = self.json_codec.decode(response.content)
+        if unwrap and "data" in response_json:
             # Since X.40.0 list responses are encapsulated in "data" with pagination parameters
             return response_json["data"]
 
         return response_json
 
+    def _send(
+        self,
+        method: str,
+        path: str,
+        params: Optional[dict[str, Any]],
+        **kwargs,
+    ) -> requests.Response:
+        """Sends a request through the rate limiter, retrying while throttled."""
+
+        attempt = 0
+        while True:
+            ticket = self.rate_limiter.acquire()
+            throttled = False
+            try:
+                response = self.session.request(
+                    method=method,
+                    url=f"{self.url}{path}",
+                    params=params,
+                    timeout=self.http_timeout,
+                    **kwargs,
+                )
+                throttled = response.status_code in THROTTLE_STATUSES
+            finally:
+                self.rate_limiter.release(ticket, throttled=throttled)
+
+            if not throttled or attempt >= self.rate_limiter.max_retries:
+                return response
+
+            delay = self.rate_limiter.retry_delay(
+                response.headers.get("Retry-After"), attempt
+            )
+            _logger.warning(
+                "Metabase throttled %s %s (HTTP %d), retrying in %.1fs",
+                method.upper(),
+                path,
+                response.status_code,
+                delay,
+            )
+            self.rate_limiter.pause(delay)
+            attempt += 1
+
     def find_database(self, name: str) -> Optional[dict]:
         """Finds database by name attribute or returns none."""
         for api_database in list(self._api("get", "/api/database")):
@@ -108,19 +384,95 @@ class Metabase:
         """Triggers schema sync on a database."""
         self._api("post", f"/api/database/{uid}/sync_schema")
 
+    def get_last_sync_duration(self, uid: str) -> Optional[float]:
+        """Seconds the last schema sync of a database took, from task history if accessible.
+
+        Task history is only accessible to admins, so it's retrieved once and failures
+        are not reported as errors.
+        """
+
+        with self._cache_lock:
+            if str(uid) in self._sync_durations:
+                return self._sync_durations[str(uid)]
+
+        duration = None
+        try:
+            tasks = self._api(
+                "get",
+                "/api/task",
+                params={"limit": 50, "offset": 0},
+                log_errors=False,
+            )
+        except requests.exceptions.HTTPError as e:
+            _logger.debug("Task history not accessible: %s", e)
+            tasks = []
+
+        for task in tasks:
+            if task.get("task") != "sync" or str(task.get("db_id")) != str(uid):
+                continue
+            # Running tasks have no duration yet
+            if task.get("duration") is None:
+                continue
+            duration = task["duration"] / 1000
+            break
+
+        with self._cache_lock:
+            self._sync_durations[str(uid)] = duration
+        return duration
+
     def get_database_metadata(self, uid: str) -> dict:
         """Retrieves metadata for all tables and fields in a database, including hidden ones."""
-        return dict(
+        metadata = dict(
             self._api(
                 method="get",
                 path=f"/api/database/{uid}/metadata",
                 params={"include_hidden": True},
             )
         )
+        # Table and field updates don't change names and IDs, only schema sync does
+        with self._cache_lock:
+            self._database_tables[str(uid)] = [
+                {k: t[k] for k in _LISTED_TABLE_KEYS if k in t}
+                for t in metadata.get("tables", [])
+            ]
+        return metadata
+
+    def get_tables(
+        self,
+        lower=True,
+        database_id: Optional[str] = None,
+        refresh: bool = False,
+    ) -> list[dict]:
+        """Retrieves all tables for all databases, or for one database if specified.
+
+        Tables of a database are taken from its metadata when already retrieved,
+        with only their IDs and names, unless refreshing, e.g. while waiting for schema sync.
+        """
+
+        if refresh:
+            self._invalidate(
+                "/api/table" if database_id is None else f"/api/database/{database_id}"
+            )
+
+        if database_id is None:
+            tables = list(self._api("get", "/api/table", cache=True))
+        else:
+            with self._cache_lock:
+                known = self._database_tables.get(str(database_id))
+            if known is not None:
+                tables = [dict(t) for t in known]
+            else:
+                tables = list(
+                    dict(
+                        self._api(
+                            method="get",
+                            path=f"/api/database/{database_id}",
+                            params={"include": "tables"},
+                            cache=True,
+                        )
+                    )["tables"]
+                )
 
-    def get_tables(self, lower=True) -> list[dict]:
-        """Retrieves all tables for all databases."""
-        tables = list(self._api("get", "/api/table"))
         if lower:
             for t in tables:
                 t["name"] = t["name"].lower()
@@ -129,15 +481,40 @@ class Metabase:
         )
         return tables
 
+    def find_table(self, uid: str, lower=True) -> Optional[dict]:
+        """Retrieves table by ID or returns none."""
+        try:
+            table = dict(self._api("get", f"/api/table/{uid}", cache=True))
+        except requests.exceptions.HTTPError as error:
+            if error.response.status_code == 404:
+                _logger.warning("Table '%s' not found", uid)
+                return None
+            raise
+        if lower:
+            table["name"] = table["name"].lower()
+        return table
+
+    def sync_table_schema(self, uid: str):
+        """Triggers schema sync on a table."""
+        self._api("post", f"/api/table/{uid}/sync_schema")
+
+    def get_table_metadata(self, uid: str) -> dict:
+        """Retrieves metadata for a table and its fields, including hidden ones."""
+        return dict(
+            self._api(
+                method="get",
+                path=f"/api/table/{uid}/query_metadata",
+                params={"include_hidden_fields": True},
+            )
+        )
+
     def get_columns(self, table_id: str, lower=True) -> list[dict]:
-        response = self._api("get", f"/api/table/{table_id}/query_metadata")
+        response = self._api("get", f"/api/table/{table_id}/query_metadata", cache=True)
         columns = list(dict(response)["fields"])
         if lower:
             for c in columns:
                 c["name"] = c["name"].lower()
-        _logger.debug(
-            f"Found columns: {[c['name'] for c in columns]}"
-        )
+        _logger.debug(f"Found columns: {[c['name'] for c in columns]}")
         return columns
 
     def get_collections(self, exclude_personal: bool) -> list[dict]:
@@ -159,15 +536,22 @@ class Metabase:
         models: list[str],
     ) -> list[dict]:
         """Retrieves collection items of specific types (e.g. card, dashboard, collection)."""
-        results = list(
-            self._api(
-                method="get",
-                path=f"/api/collection/{uid}/items",
-                params={"models": models},
-            )
-        )
-        results = list(filter(lambda x: x["model"] in models, results))
-        return results
+        return list(self.iter_collection_items(uid=uid, models=models))
+
+    def iter_collection_items(
+        self,
+        uid: str,
+        models: list[str],
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[dict]:
+        """Streams collection items of specific types, one page at a time."""
+        for item in self._iter_pages(
+            path=f"/api/collection/{uid}/items",
+            params={"models": models},
+            page_size=page_size,
+        ):
+            if item["model"] in models:
+                yield item
 
     def get_current_user(self) -> dict:
         return dict(self._api("get", "/api/user/current"))
@@ -175,7 +559,7 @@ class Metabase:
     def find_card(self, uid: str) -> Optional[dict]:
         """Retrieves card (known as question in Metabase UI)."""
         try:
-            return dict(self._api("get", f"/api/card/{uid}"))
+            return dict(self._api("get", f"/api/card/{uid}", cache=True))
         except requests.exceptions.HTTPError as error:
             if error.response.status_code == 404:
                 _logger.warning("Card '%s' not found", uid)
@@ -183,53 +567,92 @@ class Metabase:
             raise
 
     def all_cards(self, archived: bool = False):
-        return self._api(
-            "get", "/api/search", params={"models": "card", "archived": archived}
-        )
+        return self.search("card", archived=archived)
 
     def search(self, type: str, archived: bool = False, created_by=None):
+        return list(self.iter_search(type, archived=archived, created_by=created_by))
+
+    def iter_search(
+        self,
+        type: str,
+        archived: bool = False,
+        created_by=None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> Iterator[dict]:
+        """Streams search results of a specific type (e.g. card), one page at a time."""
         params = {"models": type, "archived": archived}
         if created_by is not None:
             params["created_by"] = created_by
-        return self._api("get", "/api/search", params=params)
+        return self._iter_pages("/api/search", params=params, page_size=page_size)
+
+    def _iter_pages(
+        self,
+        path: str,
+        params: dict[str, Any],
+        page_size: int,
+    ) -> Iterator[dict]:
+        """Pages through a list endpoint with limit and offset.
+
+        The next page is requested in the background while the current one is consumed.
+        Servers that don't paginate return everything in the first page, and servers
+        ignoring offset the same page again, which ends paging.
+        """
+
+        def fetch(offset: int) -> Union[dict, list]:
+            return self._api(
+                "get",
+                path,
+                params={**params, "limit": page_size, "offset": offset},
+                unwrap=False,
+            )
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            offset = 0
+            previous_items = None
+            page: Optional[Future] = executor.submit(fetch, offset)
+            while page is not None:
+                response = page.result()
+                if not isinstance(response, dict) or "data" not in response:
+                    yield from response
+                    return
+
+                items = response["data"]
+                if items and items == previous_items:
+                    _logger.warning(
+                        "Paging through '%s' not supported, offset ignored", path
+                    )
+                    return
+                previous_items = items
+
+                offset += len(items)
+                total = response.get("total")
+                if items and (
+                    offset < total if total is not None else len(items) >= page_size
+                ):
+                    page = executor.submit(fetch, offset)
+                else:
+                    page = None
+
+                yield from items
 
     def create_card(self, body: dict) -> dict:
-        headers = {"Content-Type": "application/json"}
-        return dict(
-            self._api("post", "/api/card", data=json.dumps(body), headers=headers)
-        )
+        return dict(self._api("post", "/api/card", json=body))
 
     def update_card(self, id: int, body: dict) -> dict:
-        headers = {"Content-Type": "application/json"}
-        return dict(
-            self._api("put", f"/api/card/{id}", data=json.dumps(body), headers=headers)
-        )
+        return dict(self._api("put", f"/api/card/{id}", json=body))
 
     def format_card_url(self, uid: str) -> str:
         """Formats URL link to a card (known as question in Metabase UI)."""
         return f"{self.url}/card/{uid}"
 
     def find_dashboard(self, uid: int) -> dict:
-        return dict(self._api("get", f"/api/dashboard/{uid}"))
+        return dict(self._api("get", f"/api/dashboard/{uid}", cache=True))
 
     def create_dashboard(self, name: str):
-        headers = {"Content-Type": "application/json"}
-        return dict(
-            self._api(
-                "post",
-                f"/api/dashboard",
-                data=json.dumps({"name": name}),
-                headers=headers,
-            )
-        )
+        return dict(self._api("post", "/api/dashboard", json={"name": name}))
 
     def update_dashboard(self, id: int, body: dict):
-        headers = {"Content-Type": "application/json"}
-        return dict(
-            self._api(
-                "put", f"/api/dashboard/{id}", data=json.dumps(body), headers=headers
-            )
-        )
+        return dict(self._api("put", f"/api/dashboard/{id}", json=body))
 
     def format_dashboard_url(self, uid: str) -> str:
         """Formats URL link to a dashboard."""
@@ -241,16 +664,13 @@ class Metabase:
         parent_id: Optional[int] = None,
         description: Optional[str] = None,
     ):
-        headers = {"Content-Type": "application/json"}
         body = {"name": name, "parent_id": parent_id, "description": description}
-        return dict(
-            self._api("post", "/api/collection", data=json.dumps(body), headers=headers)
-        )
+        return dict(self._api("post", "/api/collection", json=body))
 
     def find_user(self, uid: str) -> Optional[dict]:
         """Finds user by ID or returns none."""
         try:
-            return dict(self._api("get", f"/api/user/{uid}"))
+            return dict(self._api("get", f"/api/user/{uid}", cache=True))
         except requests.exceptions.HTTPError as error:
             if error.response.status_code == 404:
                 _logger.warning("User '%s' not found", uid)
@@ -268,3 +688,233 @@ class Metabase:
     def update_field(self, uid: str, body: dict) -> dict:
         """Posts an update to an existing table field."""
         return dict(self._api("put", f"/api/field/{uid}", json=body))
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class AsyncMetabase:
+    """Asynchronous counterpart of Metabase for issuing API calls concurrently.
+
+    Calls run on worker threads through the wrapped client, so they share its session,
+    connection pool and authentication. At most `concurrency` calls are in flight at once.
+    """
+
+    DEFAULT_CONCURRENCY = 8
+
+    def __init__(self, metabase: Metabase, concurrency: int = DEFAULT_CONCURRENCY):
+        if concurrency < 1:
+            raise ArgumentError("Metabase concurrency must be at least 1")
+
+        self.metabase = metabase
+        self.concurrency = concurrency
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency,
+            thread_name_prefix="dbtmetabase",
+        )
+        # Semaphores are bound to the event loop they are first used in
+        self._semaphores: MutableMapping[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+        # Loop of run_all(), on its own thread so callers may already run one
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return self.metabase.url
+
+    async def __aenter__(self) -> AsyncMetabase:
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Shuts down worker threads, waiting for calls in flight."""
+
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+            thread, self._loop_thread = self._loop_thread, None
+        if loop and thread:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+        self._executor.shutdown(wait=True)
+
+    def run_all(self, *aws: Awaitable[_T]) -> list[_T]:
+        """Runs calls concurrently from synchronous code and returns results in order.
+
+        Calls run on a background event loop, so this works whether or not the caller
+        already runs one, e.g. in Jupyter.
+        """
+
+        loop = self._background_loop()
+        if _running_loop() is loop:
+            raise RuntimeError("run_all() cannot be called from its own event loop")
+
+        async def gather() -> list[_T]:
+            return list(await asyncio.gather(*aws))
+
+        return asyncio.run_coroutine_threadsafe(gather(), loop).result()
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="dbtmetabase-loop",
+                    daemon=True,
+                )
+                self._loop_thread.start()
+            return self._loop
+
+    async def _call(self, func: Callable[..., _T], /, *args, **kwargs) -> _T:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphores[loop] = semaphore
+
+        async with semaphore:
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(func, *args, **kwargs),
+            )
+
+    async def find_database(self, name: str) -> Optional[dict]:
+        """Finds database by name attribute or returns none."""
+        return await self._call(self.metabase.find_database, name=name)
+
+    async def sync_database_schema(self, uid: str):
+        """Triggers schema sync on a database."""
+        await self._call(self.metabase.sync_database_schema, uid=uid)
+
+    async def get_last_sync_duration(self, uid: str) -> Optional[float]:
+        """Seconds the last schema sync of a database took, from task history if accessible."""
+        return await self._call(self.metabase.get_last_sync_duration, uid=uid)
+
+    async def get_database_metadata(self, uid: str) -> dict:
+        """Retrieves metadata for all tables and fields in a database, including hidden ones."""
+        return await self._call(self.metabase.get_database_metadata, uid=uid)
+
+    async def get_tables(
+        self,
+        lower=True,
+        database_id: Optional[str] = None,
+        refresh: bool = False,
+    ) -> list[dict]:
+        """Retrieves all tables for all databases, or for one database if specified."""
+        return await self._call(
+            self.metabase.get_tables,
+            lower=lower,
+            database_id=database_id,
+            refresh=refresh,
+        )
+
+    async def find_table(self, uid: str, lower=True) -> Optional[dict]:
+        """Retrieves table by ID or returns none."""
+        return await self._call(self.metabase.find_table, uid=uid, lower=lower)
+
+    async def sync_table_schema(self, uid: str):
+        """Triggers schema sync on a table."""
+        await self._call(self.metabase.sync_table_schema, uid=uid)
+
+    async def get_table_metadata(self, uid: str) -> dict:
+        """Retrieves metadata for a table and its fields, including hidden ones."""
+        return await self._call(self.metabase.get_table_metadata, uid=uid)
+
+    async def get_columns(self, table_id: str, lower=True) -> list[dict]:
+        return await self._call(
+            self.metabase.get_columns, table_id=table_id, lower=lower
+        )
+
+    async def get_collections(self, exclude_personal: bool) -> list[dict]:
+        """Retrieves all collections and optionally filters out personal collections."""
+        return await self._call(
+            self.metabase.get_collections, exclude_personal=exclude_personal
+        )
+
+    async def get_collection_items(self, uid: str, models: list[str]) -> list[dict]:
+        """Retrieves collection items of specific types (e.g. card, dashboard, collection)."""
+        return await self._call(
+            self.metabase.get_collection_items, uid=uid, models=models
+        )
+
+    async def get_current_user(self) -> dict:
+        return await self._call(self.metabase.get_current_user)
+
+    async def find_card(self, uid: str) -> Optional[dict]:
+        """Retrieves card (known as question in Metabase UI)."""
+        return await self._call(self.metabase.find_card, uid=uid)
+
+    async def all_cards(self, archived: bool = False):
+        return await self._call(self.metabase.all_cards, archived=archived)
+
+    async def search(self, type: str, archived: bool = False, created_by=None):
+        return await self._call(
+            self.metabase.search, type=type, archived=archived, created_by=created_by
+        )
+
+    async def create_card(self, body: dict) -> dict:
+        return await self._call(self.metabase.create_card, body=body)
+
+    async def update_card(self, id: int, body: dict) -> dict:
+        return await self._call(self.metabase.update_card, id=id, body=body)
+
+    def format_card_url(self, uid: str) -> str:
+        """Formats URL link to a card (known as question in Metabase UI)."""
+        return self.metabase.format_card_url(uid=uid)
+
+    async def find_dashboard(self, uid: int) -> dict:
+        return await self._call(self.metabase.find_dashboard, uid=uid)
+
+    async def create_dashboard(self, name: str):
+        return await self._call(self.metabase.create_dashboard, name=name)
+
+    async def update_dashboard(self, id: int, body: dict):
+        return await self._call(self.metabase.update_dashboard, id=id, body=body)
+
+    def format_dashboard_url(self, uid: str) -> str:
+        """Formats URL link to a dashboard."""
+        return self.metabase.format_dashboard_url(uid=uid)
+
+    async def create_collection(
+        self,
+        name: str,
+        parent_id: Optional[int] = None,
+        description: Optional[str] = None,
+    ):
+        return await self._call(
+            self.metabase.create_collection,
+            name=name,
+            parent_id=parent_id,
+            description=description,
+        )
+
+    async def find_user(self, uid: str) -> Optional[dict]:
+        """Finds user by ID or returns none."""
+        return await self._call(self.metabase.find_user, uid=uid)
+
+    async def update_table(self, uid: str, body: dict) -> dict:
+        """Posts update to an existing table."""
+        return await self._call(self.metabase.update_table, uid=uid, body=body)
+
+    async def update_table_field_order(self, uid: str, body: list) -> list:
+        """Posts update to field order of an existing table."""
+        return await self._call(
+            self.metabase.update_table_field_order, uid=uid, body=body
+        )
+
+    async def update_field(self, uid: str, body: dict) -> dict:
+        """Posts an update to an existing table field."""
+        return await self._call(self.metabase.update_field, uid=uid, body=body)
@@ -31,7 +31,7 @@ setup(
     entry_points={
         "console_scripts": ["dbt-metabase = dbtmetabase.__main__:cli"],
     },
-    packages=find_packages(exclude=["tests", "sandbox"]),
+    packages=find_packages(exclude=["tests", "sandbox", "benchmarks"]),
     install_requires=requires_from_pipfile_lock("Pipfile.lock"),
     classifiers=[
         "Intended Audience :: Developers",
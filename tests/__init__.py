@@ -2,6 +2,7 @@ import logging
 
 from dbtmetabase.format import setup_logging
 
+from .test_cli import *
 from .test_exposures import *
 from .test_format import *
 from .test_manifest import *
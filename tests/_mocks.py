@@ -1,4 +1,5 @@
 import json
+import shutil
 from pathlib import Path
 from typing import Any, Dict, Mapping, Optional, Sequence
 
@@ -6,12 +7,20 @@ import requests
 
 from dbtmetabase.core import DbtMetabase
 from dbtmetabase.manifest import Manifest, Model
-from dbtmetabase.metabase import Metabase
+from dbtmetabase.metabase import AsyncMetabase, Metabase
 
 FIXTURES_PATH = Path("tests") / "fixtures"
 TMP_PATH = Path("tests") / "tmp"
 
 
+def fixture_target_dir(manifest_name: str) -> Path:
+    """Stages a fixture manifest as manifest.json in its own target directory."""
+    target_dir = TMP_PATH / "target" / Path(manifest_name).stem
+    target_dir.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(FIXTURES_PATH / manifest_name, target_dir / "manifest.json")
+    return target_dir
+
+
 class MockMetabase(Metabase):
     def __init__(self, url: str):
         super().__init__(
@@ -27,7 +36,7 @@ class MockMetabase(Metabase):
             http_adapter=None,
         )
 
-    def _api(
+    def _request(
         self,
         method: str,
         path: str,
@@ -50,7 +59,9 @@ class MockMetabase(Metabase):
 class MockManifest(Manifest):
     _models: Sequence[Model] = []
 
-    def read_models(self) -> Sequence[Model]:
+    def read_models(self, **kwargs) -> Sequence[Model]:
+        if kwargs:
+            return super().read_models(**kwargs)
         if not self._models:
             self._models = super().read_models()
         return self._models
@@ -59,8 +70,10 @@ class MockManifest(Manifest):
 class MockDbtMetabase(DbtMetabase):
     def __init__(
         self,
-        manifest_path: Path = FIXTURES_PATH / "manifest-v2.json",
+        manifest_name: str = "manifest-v2.json",
         metabase_url: str = "http://localhost:3000",
     ):  # pylint: disable=super-init-not-called
-        self._manifest = MockManifest(path=manifest_path)
+        self._manifest = MockManifest(target_dir=fixture_target_dir(manifest_name))
         self._metabase = MockMetabase(url=metabase_url)
+        self._http_concurrency = AsyncMetabase.DEFAULT_CONCURRENCY
+        self._async_metabase = None
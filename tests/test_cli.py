@@ -0,0 +1,70 @@
+import unittest
+from unittest import mock
+
+from click.testing import CliRunner
+
+from dbtmetabase.__main__ import cli
+from dbtmetabase.core import DbtMetabase
+from dbtmetabase.manifest import Manifest
+
+from ._mocks import fixture_target_dir
+
+
+class TestCli(unittest.TestCase):
+    def test_clear_manifest_cache(self):
+        target_dir = fixture_target_dir("manifest-v11.json")
+        cache_dir = target_dir / Manifest.CACHE_DIR
+
+        Manifest(target_dir, cache_dir=cache_dir).read_models()
+        # Left behind by an interrupted write
+        (cache_dir / "models-interrupted.pickle.tmp").touch()
+        self.assertTrue(any(cache_dir.iterdir()))
+
+        # Cleared without the cache being used
+        with mock.patch.object(DbtMetabase, "export_models") as export_models:
+            result = CliRunner().invoke(
+                cli,
+                [
+                    "models",
+                    "--target-path",
+                    str(target_dir),
+                    "--clear-manifest-cache",
+                    "--metabase-url",
+                    "http://localhost",
+                    "--metabase-api-key",
+                    "mb_key",
+                    "--metabase-database",
+                    "unit_testing",
+                ],
+            )
+
+        self.assertEqual(0, result.exit_code, result.output)
+        export_models.assert_called_once()
+        self.assertEqual([], list(cache_dir.iterdir()))
+
+    def test_exposures_database(self):
+        target_dir = fixture_target_dir("manifest-v11.json")
+        args = [
+            "exposures",
+            "--target-path",
+            str(target_dir),
+            "--metabase-url",
+            "http://localhost",
+            "--metabase-api-key",
+            "mb_key",
+            "--output-path",
+            str(target_dir),
+        ]
+
+        # Database of models doesn't scope exposures, only its own option does
+        with mock.patch.object(DbtMetabase, "extract_exposures") as extract_exposures:
+            runner = CliRunner(env={"METABASE_DATABASE": "unit_testing"})
+            result = runner.invoke(cli, args)
+            self.assertEqual(0, result.exit_code, result.output)
+            self.assertIsNone(extract_exposures.call_args.kwargs["metabase_database"])
+
+            result = runner.invoke(cli, args + ["--tables-database", "unit_testing"])
+            self.assertEqual(0, result.exit_code, result.output)
+            self.assertEqual(
+                "unit_testing", extract_exposures.call_args.kwargs["metabase_database"]
+            )
@@ -1,9 +1,13 @@
 import unittest
 from operator import itemgetter
 from pathlib import Path
+from unittest import mock
 
+import requests
 import yaml
 
+from dbtmetabase.errors import MetabaseStateError
+
 from ._mocks import FIXTURES_PATH, TMP_PATH, MockDbtMetabase
 
 
@@ -36,6 +40,56 @@ class TestExposures(unittest.TestCase):
             output_path / "exposures.yml",
         )
 
+    def test_exposures_database(self):
+        fixtures_path = FIXTURES_PATH / "exposure" / "default"
+        output_path = TMP_PATH / "exposure" / "database"
+        self.c.extract_exposures(
+            output_path=str(output_path),
+            output_grouping=None,
+            metabase_database="unit_testing",
+        )
+
+        self._assert_exposures(
+            fixtures_path / "exposures.yml",
+            output_path / "exposures.yml",
+        )
+
+        # Tables missing from the listing are looked up by ID
+        with mock.patch.object(self.c.metabase, "get_tables", return_value=[]):
+            self.c.extract_exposures(
+                output_path=str(output_path),
+                output_grouping=None,
+                metabase_database="unit_testing",
+            )
+
+        self._assert_exposures(
+            fixtures_path / "exposures.yml",
+            output_path / "exposures.yml",
+        )
+
+        # Tables that cannot be looked up are skipped
+        forbidden = requests.Response()
+        forbidden.status_code = 403
+        with mock.patch.object(
+            self.c.metabase, "get_tables", return_value=[]
+        ), mock.patch.object(
+            self.c.metabase,
+            "find_table",
+            side_effect=requests.exceptions.HTTPError(response=forbidden),
+        ) as find_table:
+            self.c.extract_exposures(
+                output_path=str(output_path),
+                output_grouping=None,
+                metabase_database="unit_testing",
+            )
+        find_table.assert_called()
+
+        with self.assertRaises(MetabaseStateError):
+            self.c.extract_exposures(
+                output_path=str(output_path),
+                metabase_database="foo",
+            )
+
     def test_exposures_collection_grouping(self):
         fixtures_path = FIXTURES_PATH / "exposure" / "collection"
         output_path = TMP_PATH / "exposure" / "collection"
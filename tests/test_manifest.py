@@ -1,15 +1,32 @@
+import io
+import json
+import os
+import pickle
+import shutil
 import unittest
 from operator import attrgetter
 from typing import Optional, Sequence
+from unittest import mock
 
-from dbtmetabase.manifest import Column, Group, Manifest, Model
+from dbtmetabase._json import iter_sections
+from dbtmetabase.format import Filter
+from dbtmetabase.manifest import (
+    CatalogColumn,
+    Column,
+    Group,
+    Manifest,
+    Model,
+    _replace_conditions_in_query,
+)
 
-from ._mocks import FIXTURES_PATH
+from ._mocks import FIXTURES_PATH, TMP_PATH, fixture_target_dir
 
 
 class TestManifest(unittest.TestCase):
     def test_v11_disabled(self):
-        models = Manifest(FIXTURES_PATH / "manifest-v11-disabled.json").read_models()
+        models = Manifest(
+            fixture_target_dir("manifest-v11-disabled.json")
+        ).read_models()
 
         orders_mod = self._find_model(models, "orders")
         self.assertIsNone(orders_mod)
@@ -20,7 +37,7 @@ class TestManifest(unittest.TestCase):
         self.assertIsNone(customer_id_col.fk_target_field)
 
     def test_v11(self):
-        models = Manifest(FIXTURES_PATH / "manifest-v11.json").read_models()
+        models = Manifest(fixture_target_dir("manifest-v11.json")).read_models()
         self._assertModelsEqual(
             models,
             [
@@ -199,7 +216,7 @@ class TestManifest(unittest.TestCase):
         )
 
     def test_v2(self):
-        models = Manifest(FIXTURES_PATH / "manifest-v2.json").read_models()
+        models = Manifest(fixture_target_dir("manifest-v2.json")).read_models()
         self._assertModelsEqual(
             models,
             [
@@ -350,6 +367,285 @@ class TestManifest(unittest.TestCase):
             ],
         )
 
+    def test_stream(self):
+        for manifest_name in (
+            "manifest-v2.json",
+            "manifest-v11.json",
+            "manifest-v11-disabled.json",
+        ):
+            target_dir = fixture_target_dir(manifest_name)
+            self._assertModelsEqual(
+                Manifest(target_dir, stream=True).read_models(),
+                Manifest(target_dir).read_models(),
+            )
+
+    def test_stream_sections(self):
+        path = FIXTURES_PATH / "manifest-v11.json"
+        with open(path, encoding="utf-8") as f:
+            expected = json.load(f)
+
+        with open(path, encoding="utf-8") as f:
+            actual: dict = {}
+            for section, key, value in iter_sections(
+                f,
+                sections=("nodes", "child_map"),
+                chunk_size=64,
+            ):
+                actual.setdefault(section, {})[key] = value
+
+        self.assertEqual(expected["nodes"], actual["nodes"])
+        self.assertEqual(expected["child_map"], actual["child_map"])
+
+    def test_stream_chunk_boundaries(self):
+        doc = (
+            '{"n": {"x": 1.25e10, "y": -0.5, "z": 3E-7, "w": 42, "v": [1.5e+2, true]},'
+            ' "s": 2.75, "m": {"u": null, "t": -12.0e1}}'
+        )
+        expected = json.loads(doc)
+
+        # Numbers split by every possible chunk boundary, e.g. right after "." or "e"
+        for chunk_size in range(1, len(doc) + 1):
+            actual: dict = {}
+            for section, key, value in iter_sections(
+                io.StringIO(doc),
+                sections=("n", "m"),
+                chunk_size=chunk_size,
+            ):
+                actual.setdefault(section, {})[key] = value
+
+            self.assertEqual(
+                {"n": expected["n"], "m": expected["m"]}, actual, chunk_size
+            )
+
+    def test_shared_parse(self):
+        manifest = Manifest(fixture_target_dir("manifest-v11.json"))
+        models = manifest.read_models()
+        fingerprint = manifest.fingerprint
+
+        self.assertIs(models[0], manifest.read_models()[0])
+        self.assertEqual("ref('orders')", manifest.read_refs()["orders"])
+
+        # Touching the file without changing it keeps parsed models
+        os.utime(manifest.path)
+        self.assertIs(models[0], manifest.read_models()[0])
+        self.assertEqual(fingerprint.digest, manifest.fingerprint.digest)
+
+        shutil.copyfile(FIXTURES_PATH / "manifest-v2.json", manifest.path)
+        self.assertNotEqual(fingerprint.digest, manifest.fingerprint.digest)
+        self.assertIsNotNone(self._find_model(manifest.read_models(), "stg_orders"))
+
+    def test_lazy_digest(self):
+        manifest = Manifest(fixture_target_dir("manifest-v11.json"))
+
+        # Without the on-disk cache, manifest.json is only read to parse it
+        with mock.patch.object(
+            Manifest, "_digest", side_effect=AssertionError("hashed")
+        ):
+            models = manifest.read_models()
+            os.utime(manifest.path)
+            self.assertIsNot(models[0], manifest.read_models()[0])
+
+    def test_disk_cache(self):
+        target_dir = fixture_target_dir("manifest-v11.json")
+        cache_dir = TMP_PATH / "manifest_cache"
+
+        cold = Manifest(target_dir, cache_dir=cache_dir)
+        cold.clear_cache()
+        expected = cold.read_models()
+
+        # Warm run never decodes manifest.json
+        warm = Manifest(target_dir, cache_dir=cache_dir)
+        with mock.patch("json.load", side_effect=AssertionError("decoded")):
+            self._assertModelsEqual(expected, warm.read_models())
+
+        warm.clear_cache()
+        self.assertEqual([], list(cache_dir.glob("*.pickle")))
+
+    def test_model_slots(self):
+        model = Model(
+            database="dbtmetabase",
+            schema="public",
+            group=Group.nodes,
+            name="orders",
+            alias="orders",
+            tags=["finance", "daily"],
+            columns=[Column(name="order_id", fk_target_table="public.customers")],
+        )
+
+        # Tags are stored as a tuple, yet still compare and iterate in order
+        self.assertEqual(("finance", "daily"), model.tags)
+        self.assertEqual(["finance", "daily"], list(model.tags))
+        self.assertEqual((), Model("db", "public", Group.nodes, "a", "a").tags)
+        self.assertFalse(hasattr(model, "__dict__"))
+        self.assertFalse(hasattr(model.columns[0], "__dict__"))
+
+        # Slotted models survive the on-disk cache
+        restored = pickle.loads(pickle.dumps(model))
+        self.assertEqual(model, restored)
+        self.assertEqual(model.columns, restored.columns)
+
+    def test_interned_names(self):
+        first = Manifest(fixture_target_dir("manifest-v11.json")).read_models()
+        second = Manifest(fixture_target_dir("manifest-v11.json")).read_models()
+
+        # Separate parses share one string per repeated name
+        for model, other in zip(first, second):
+            self.assertIs(model.database, other.database)
+            self.assertIs(model.schema, other.schema)
+            for column, other_column in zip(model.columns, other.columns):
+                self.assertIs(column.name, other_column.name)
+                self.assertIs(column.fk_target_table, other_column.fk_target_table)
+
+    def test_diff_models(self):
+        state = Manifest(fixture_target_dir("manifest-v11.json"))
+        self.assertEqual({}, Manifest(state.target_dir).diff_models(state))
+
+        target_dir = TMP_PATH / "target" / "modified"
+        target_dir.mkdir(parents=True, exist_ok=True)
+        with open(state.path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        nodes = manifest["nodes"]
+        nodes["model.sandbox.orders"]["columns"]["status"]["description"] = "New"
+        nodes["model.sandbox.customers"]["description"] = "New"
+        del nodes["model.sandbox.stg_orders"]["columns"]["status"]
+        with open(target_dir / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+        self.assertEqual(
+            {
+                "model.sandbox.orders": {"status"},
+                "model.sandbox.customers": None,
+                "model.sandbox.stg_orders": None,
+            },
+            Manifest(target_dir).diff_models(state),
+        )
+
+    def test_selection_pushdown(self):
+        target_dir = fixture_target_dir("manifest-v2.json")
+        expected = [m for m in Manifest(target_dir).read_models() if m.name == "orders"]
+
+        for stream in (False, True):
+            manifest = Manifest(target_dir, stream=stream)
+            with mock.patch.object(
+                manifest, "_read_model", wraps=manifest._read_model
+            ) as read_model:
+                models = manifest.read_models(
+                    schema_filter=Filter(include=["public"]),
+                    model_filter=Filter(include=["orders"]),
+                    skip_sources=True,
+                )
+            self.assertEqual(1, read_model.call_count)
+            self._assertModelsEqual(expected, models)
+
+    def test_compiled_code(self):
+        target_dir = TMP_PATH / "target" / "compiled"
+        shutil.rmtree(target_dir, ignore_errors=True)
+        target_dir.mkdir(parents=True)
+        with open(FIXTURES_PATH / "manifest-v11.json", encoding="utf-8") as f:
+            manifest = json.load(f)
+        nodes = manifest["nodes"]
+        del nodes["model.sandbox.customers"]["compiled_code"]
+        manifest["exposures"] = {
+            "exposure.sandbox.dash": {
+                "name": "dash",
+                "type": "dashboard",
+                "depends_on": {
+                    "nodes": ["model.sandbox.orders", "model.sandbox.customers"]
+                },
+                "meta": {"metabase.filters": {}},
+            }
+        }
+        with open(target_dir / "manifest.json", "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+        # Only models without compiled code in the manifest are read from disk
+        compiled_path = target_dir / "compiled" / "sandbox" / "models"
+        compiled_path.mkdir(parents=True)
+        (compiled_path / "customers.sql").write_text("select 1", encoding="utf-8")
+
+        for stream in (False, True):
+            dashboards = Manifest(target_dir, stream=stream).read_dashboards()
+            self.assertEqual(1, len(dashboards))
+            cards = dashboards[0].cards
+            self.assertEqual(
+                nodes["model.sandbox.orders"]["compiled_code"],
+                cards["orders"].compile_sql,
+            )
+            self.assertEqual("select 1", cards["customers"].compile_sql)
+
+    def test_read_catalog(self):
+        target_dir = TMP_PATH / "target" / "catalog"
+        target_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(
+            FIXTURES_PATH / "manifest-v11.json", target_dir / "manifest.json"
+        )
+        manifest = Manifest(target_dir)
+        manifest.catalog_path.unlink(missing_ok=True)
+        self.assertEqual({}, manifest.read_catalog())
+
+        with open(manifest.catalog_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "metadata": {"dbt_schema_version": "v1"},
+                    "nodes": {
+                        "model.sandbox.stg_customers": {
+                            "columns": {
+                                "last_name": {
+                                    "name": "last_name",
+                                    "type": "text",
+                                    "index": 3,
+                                },
+                                "customer_id": {
+                                    "name": "customer_id",
+                                    "type": "integer",
+                                    "index": 1,
+                                },
+                                "first_name": {
+                                    "name": "first_name",
+                                    "type": "text",
+                                    "index": 2,
+                                },
+                            }
+                        },
+                        "model.sandbox.orders": {"columns": {}},
+                    },
+                    "sources": {},
+                },
+                f,
+            )
+
+        self.assertEqual(
+            {
+                "model.sandbox.stg_customers": [
+                    CatalogColumn(name="customer_id", type="integer", index=1),
+                    CatalogColumn(name="first_name", type="text", index=2),
+                    CatalogColumn(name="last_name", type="text", index=3),
+                ]
+            },
+            manifest.read_catalog(unique_ids={"model.sandbox.stg_customers"}),
+        )
+
+    def test_replace_conditions(self):
+        query = (
+            "select * from orders where '__filter__.status' is not null\n"
+            "and ('__filter__.amount'\n  is  not null or '__filter__.status' is not null)\n"
+            "and '__filter__.other' is null"
+        )
+        self.assertEqual(
+            (
+                "select * from orders where {{ status }}\n"
+                "and ({{ amount }} or {{ status }})\n"
+                "and '__filter__.other' is null",
+                {"status", "amount"},
+            ),
+            _replace_conditions_in_query(query),
+        )
+
+        # Memoized results are not shared between callers
+        _, filters = _replace_conditions_in_query(query)
+        filters.clear()
+        self.assertEqual({"status", "amount"}, _replace_conditions_in_query(query)[1])
+
     def _assertModelsEqual(
         self,
         first: Sequence[Model],
@@ -1,6 +1,26 @@
+import asyncio
+import gzip
+import json
+import os
+import shutil
+import stat
+import threading
+import time
 import unittest
+from typing import Optional
+from unittest import mock
 
-from ._mocks import MockMetabase
+import requests
+from requests.adapters import HTTPAdapter
+
+from dbtmetabase._json import STDLIB_CODEC, JSONCodec
+from dbtmetabase._limits import RateLimiter
+from dbtmetabase._sessions import SessionCache
+from dbtmetabase._transport import ReplayAdapter
+from dbtmetabase.core import DbtMetabase
+from dbtmetabase.metabase import COMPRESS_MIN_SIZE, AsyncMetabase, Metabase
+
+from ._mocks import TMP_PATH, MockMetabase
 
 
 class TestMetabase(unittest.TestCase):
@@ -13,6 +33,77 @@ class TestMetabase(unittest.TestCase):
         self.assertEqual(2, db["id"])
         self.assertIsNone(self.metabase.find_database(name="foo"))
 
+    def test_metabase_get_tables(self):
+        tables = self.metabase.get_tables(database_id="2")
+        self.assertEqual(
+            {t["id"] for t in self.metabase.get_tables()},
+            {t["id"] for t in tables},
+        )
+        self.assertTrue(all(t["name"].islower() for t in tables))
+
+        # Tables of retrieved metadata are reused, only their IDs and names
+        self.metabase.cache_clear()
+        self.metabase.get_database_metadata(uid="2")
+        with mock.patch.object(self.metabase, "_request") as request:
+            tables = self.metabase.get_tables(database_id="2")
+        request.assert_not_called()
+        self.assertEqual(8, len(tables))
+        self.assertEqual({"id", "name", "schema", "db_id"}, set(tables[0]))
+
+        # Until schema sync
+        self.metabase.sync_database_schema(uid="2")
+        with mock.patch.object(
+            self.metabase, "_request", wraps=self.metabase._request
+        ) as request:
+            self.metabase.get_tables(database_id="2")
+        request.assert_called_once()
+
+    def test_metabase_find_table(self):
+        table = self.metabase.find_table(uid="5")
+        assert table
+        self.assertEqual("stg_orders", table["name"])
+        self.assertIsNone(self.metabase.find_table(uid="404"))
+
+    def test_metabase_get_last_sync_duration(self):
+        running = {"task": "sync", "db_id": 2, "duration": None}
+        finished = {"task": "sync", "db_id": 2, "duration": 1500}
+        other = {"task": "sync", "db_id": 3, "duration": 500}
+
+        with mock.patch.object(
+            self.metabase, "_api", return_value=[running, other, finished]
+        ):
+            self.assertEqual(1.5, self.metabase.get_last_sync_duration(uid="2"))
+        self.metabase.cache_clear()
+        with mock.patch.object(self.metabase, "_api", return_value=[running, other]):
+            self.assertIsNone(self.metabase.get_last_sync_duration(uid="2"))
+
+    def test_metabase_get_last_sync_duration_forbidden(self):
+        forbidden = requests.Response()
+        forbidden.status_code = 403
+        forbidden._content = b'"You don\'t have permissions to do that."'
+
+        metabase = Metabase(
+            url="http://localhost",
+            api_key="mb_key",
+            username=None,
+            password=None,
+            session_id=None,
+            skip_verify=False,
+            cert=None,
+            http_timeout=1,
+            http_headers=None,
+            http_adapter=None,
+        )
+        self.addCleanup(metabase.session.close)
+
+        # Not accessible to non-admins, retrieved once without reporting errors
+        with mock.patch.object(
+            metabase, "_send", return_value=forbidden
+        ) as send, self.assertNoLogs("dbtmetabase.metabase", level="ERROR"):
+            self.assertIsNone(metabase.get_last_sync_duration(uid="2"))
+            self.assertIsNone(metabase.get_last_sync_duration(uid="2"))
+        send.assert_called_once()
+
     def test_metabase_get_collections(self):
         excluded = self.metabase.get_collections(exclude_personal=True)
         self.assertEqual(3, len(excluded))
@@ -38,3 +129,417 @@ class TestMetabase(unittest.TestCase):
             models=("card", "dashboard"),
         )
         self.assertEqual({"card", "dashboard"}, {item["model"] for item in both})
+
+    def test_metabase_cache(self):
+        card = self.metabase.find_card(uid="5")
+        assert card
+        card["name"] = "Modified"
+
+        # Cached copies are not affected by callers
+        cached = self.metabase.find_card(uid="5")
+        assert cached
+        self.assertNotEqual("Modified", cached["name"])
+        self.assertEqual((1, 1), self.metabase.cache_info()[:2])
+        self.assertEqual(1, self.metabase.cache_info().currsize)
+
+        # Not opted in
+        self.metabase.get_collections(exclude_personal=True)
+        self.assertEqual(1, self.metabase.cache_info().currsize)
+
+        self.metabase.find_card(uid="6")
+        self.metabase.update_card(id=5, body={"name": "Modified"})
+        self.metabase.find_card(uid="6")
+        self.metabase.find_card(uid="5")
+        self.assertEqual((2, 3), self.metabase.cache_info()[:2])
+
+    def test_metabase_cache_dependents(self):
+        self.metabase.find_card(uid="5")
+        self.metabase.find_dashboard(uid=1)
+        self.metabase.find_user(uid="1")
+        self.assertEqual(3, self.metabase.cache_info().currsize)
+
+        # Dashboards embed cards, users are unrelated
+        self.metabase.update_card(id=6, body={})
+        self.assertEqual(2, self.metabase.cache_info().currsize)
+        self.metabase.find_user(uid="1")
+        self.assertEqual(1, self.metabase.cache_info().hits)
+
+    def test_metabase_json_codec(self):
+        loads = mock.Mock(side_effect=STDLIB_CODEC.loads)
+        self.metabase.json_codec = JSONCodec(
+            name="custom", loads=loads, dumps=STDLIB_CODEC.dumps
+        )
+
+        self.metabase.find_user(uid="1")
+        user = self.metabase.find_user(uid="1")
+        assert user
+        self.assertEqual(1, user["id"])
+        loads.assert_called_once()
+
+    def test_metabase_iter_search(self):
+        cards = [{"id": i, "model": "card"} for i in range(7)]
+        offsets = []
+
+        def request(method, path, params=None, unwrap=True, **kwargs):
+            offsets.append(params["offset"])
+            data = cards[params["offset"] : params["offset"] + params["limit"]]
+            return {"data": data, "total": len(cards), **params}
+
+        with mock.patch.object(self.metabase, "_request", side_effect=request):
+            results = list(self.metabase.iter_search("card", page_size=3))
+
+        self.assertEqual(cards, results)
+        self.assertEqual([0, 3, 6], offsets)
+
+    def test_metabase_iter_search_offset_ignored(self):
+        cards = [{"id": i, "model": "card"} for i in range(3)]
+
+        def search(total: Optional[int]) -> tuple[list, int]:
+            # Every page is the first one
+            def request(method, path, params=None, unwrap=True, **kwargs):
+                response = {"data": cards[: params["limit"]]}
+                if total is not None:
+                    response["total"] = total
+                return response
+
+            with mock.patch.object(
+                self.metabase, "_request", side_effect=request
+            ) as request_mock:
+                results = list(self.metabase.iter_search("card", page_size=3))
+            return results, request_mock.call_count
+
+        self.assertEqual((cards, 2), search(total=None))
+        self.assertEqual((cards, 2), search(total=7))
+
+    def test_metabase_iter_collection_items(self):
+        # Fixture server doesn't paginate, so all items come in the first page
+        items = list(
+            self.metabase.iter_collection_items(uid="3", models=["card"], page_size=2)
+        )
+        self.assertGreater(len(items), 2)
+        self.assertEqual({"card"}, {item["model"] for item in items})
+
+
+class TestConnections(unittest.TestCase):
+    def test_pool_size(self):
+        core = DbtMetabase(
+            metabase_url="http://localhost",
+            metabase_api_key="key",
+            http_concurrency=32,
+        )
+        adapter = core.metabase.session.get_adapter("http://localhost/api/card")
+        self.assertEqual(33, adapter._pool_maxsize)
+        self.assertFalse(adapter._pool_block)
+
+        core = DbtMetabase(
+            metabase_url="http://localhost",
+            metabase_api_key="key",
+            http_pool_size=4,
+            http_pool_block=True,
+        )
+        adapter = core.metabase.session.get_adapter("http://localhost/api/card")
+        self.assertEqual(4, adapter._pool_maxsize)
+        self.assertTrue(adapter._pool_block)
+
+    def test_compression(self):
+        metabase = Metabase(
+            url="http://localhost",
+            api_key="key",
+            username=None,
+            password=None,
+            session_id=None,
+            skip_verify=False,
+            cert=None,
+            http_timeout=1,
+            http_headers=None,
+            http_adapter=None,
+            compress_requests=True,
+        )
+
+        sent = []
+
+        def request(session, method, url, **kwargs):
+            sent.append(kwargs)
+            response = requests.Response()
+            response.status_code = 200
+            response._content = b"{}"
+            return response
+
+        with mock.patch.object(
+            requests.Session, "request", autospec=True, side_effect=request
+        ):
+            metabase.update_card(id=1, body={"name": "Small"})
+            body = {"name": "Large", "description": "x" * COMPRESS_MIN_SIZE}
+            metabase.update_card(id=1, body=body)
+
+        self.assertNotIn("Content-Encoding", sent[0]["headers"])
+        self.assertEqual("gzip", sent[1]["headers"]["Content-Encoding"])
+        self.assertEqual(body, json.loads(gzip.decompress(sent[1]["data"])))
+
+
+class TestTransport(unittest.TestCase):
+    def setUp(self):
+        self.path = TMP_PATH / "cassette"
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def _connect(self, http_adapter: HTTPAdapter, **kwargs) -> Metabase:
+        return Metabase(
+            url="http://localhost",
+            api_key=None,
+            username="user",
+            password="password",
+            session_id=None,
+            skip_verify=False,
+            cert=None,
+            http_timeout=1,
+            http_headers=None,
+            http_adapter=http_adapter,
+            **kwargs,
+        )
+
+    def test_record_replay(self):
+        def send(request, **kwargs):
+            response = requests.Response()
+            response.status_code = 200
+            if request.path_url == "/api/session":
+                response._content = b'{"id": "secret"}'
+                response.headers["Set-Cookie"] = "metabase.SESSION=cookie; HttpOnly"
+            elif request.method == "GET":
+                response._content = json.dumps([{"url": request.path_url}]).encode()
+            else:
+                response._content = json.dumps({"url": request.path_url}).encode()
+            return response
+
+        adapter = HTTPAdapter()
+        with mock.patch.object(adapter, "send", side_effect=send):
+            metabase = self._connect(adapter, record_path=self.path)
+            recorded = metabase.get_collections(exclude_personal=True)
+            metabase.update_field(uid="1", body={"description": "Recorded"})
+
+        recorded_files = "".join(p.read_text() for p in self.path.iterdir())
+        self.assertNotIn("secret", recorded_files)
+        self.assertNotIn("cookie", recorded_files.lower())
+
+        replay = ReplayAdapter(self.path, latency=0.05)
+        metabase = self._connect(replay)
+        start = time.monotonic()
+        self.assertEqual(recorded, metabase.get_collections(exclude_personal=True))
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+        # Writes match regardless of body, unrecorded requests are not found
+        self.assertEqual(
+            {"url": "/api/field/1"},
+            metabase.update_field(uid="1", body={"description": "Replayed"}),
+        )
+        self.assertIsNone(metabase.find_card(uid="1"))
+
+        replay.error_rate = 1
+        metabase.rate_limiter.max_retries = 0
+        with self.assertRaises(requests.exceptions.HTTPError):
+            metabase.get_collections(exclude_personal=True)
+
+
+class TestSessionCache(unittest.TestCase):
+    def setUp(self):
+        self.path = TMP_PATH / "sessions" / "sessions.json"
+        self.path.unlink(missing_ok=True)
+        self.cache = SessionCache(self.path)
+
+    def test_session_cache(self):
+        self.assertIsNone(self.cache.get("http://localhost", "user"))
+
+        self.cache.set("http://localhost", "user", "token")
+        self.assertEqual("token", self.cache.get("http://localhost", "user"))
+        self.assertIsNone(self.cache.get("http://localhost", "other"))
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.path).st_mode))
+
+        self.cache.set("http://localhost", "user", None)
+        self.assertIsNone(self.cache.get("http://localhost", "user"))
+
+    def test_session_reuse(self):
+        requests_made = []
+        valid_tokens = set()
+
+        def request(session, method, url, **kwargs):
+            path = url.removeprefix("http://localhost")
+            requests_made.append(path)
+
+            response = requests.Response()
+            response.status_code = 200
+            if path == "/api/session":
+                token = f"token{len(valid_tokens)}"
+                valid_tokens.add(token)
+                response._content = json.dumps({"id": token}).encode()
+            elif session.headers.get("X-Metabase-Session") in valid_tokens:
+                response._content = b'{"id": 1}'
+            else:
+                response.status_code = 401
+            return response
+
+        def patch_request():
+            return mock.patch.object(
+                requests.Session, "request", autospec=True, side_effect=request
+            )
+
+        def connect() -> Metabase:
+            with patch_request():
+                return Metabase(
+                    url="http://localhost",
+                    api_key=None,
+                    username="user",
+                    password="password",
+                    session_id=None,
+                    skip_verify=False,
+                    cert=None,
+                    http_timeout=1,
+                    http_headers=None,
+                    http_adapter=None,
+                    session_cache=self.cache,
+                )
+
+        connect()
+        self.assertEqual(["/api/session"], requests_made)
+
+        # Cached session skips login
+        requests_made.clear()
+        metabase = connect()
+        with patch_request():
+            metabase.get_current_user()
+        self.assertEqual(["/api/user/current"], requests_made)
+
+        # Expired session logs in again once
+        requests_made.clear()
+        valid_tokens.clear()
+        metabase = connect()
+        with patch_request():
+            metabase.get_current_user()
+        self.assertEqual(
+            ["/api/user/current", "/api/session", "/api/user/current"],
+            requests_made,
+        )
+        self.assertEqual("token0", self.cache.get("http://localhost", "user"))
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_aimd(self):
+        limiter = RateLimiter(max_concurrency=8)
+        tickets = [limiter.acquire() for _ in range(4)]
+
+        # Burst of throttled calls only halves once
+        for ticket in tickets:
+            limiter.release(ticket, throttled=True)
+        self.assertEqual(4, limiter.limit)
+
+        for _ in range(8):
+            limiter.release(limiter.acquire(), throttled=False)
+        self.assertEqual(5, limiter.limit)
+
+        for _ in range(100):
+            limiter.release(limiter.acquire(), throttled=False)
+        self.assertEqual(8, limiter.limit)
+
+    def test_rate(self):
+        limiter = RateLimiter(rate=50)
+        start = time.monotonic()
+        # One second's worth of calls can burst, the rest is paced
+        for _ in range(100):
+            limiter.release(limiter.acquire(), throttled=False)
+        self.assertAlmostEqual(1, time.monotonic() - start, delta=0.2)
+
+    def test_retry_delay(self):
+        limiter = RateLimiter(backoff_factor=0.5)
+        self.assertEqual(3, limiter.retry_delay("3", attempt=0))
+        self.assertEqual(0.5, limiter.retry_delay(None, attempt=0))
+        self.assertEqual(2, limiter.retry_delay("soon", attempt=2))
+        self.assertEqual(
+            0, limiter.retry_delay("Wed, 21 Oct 2015 07:28:00 GMT", attempt=0)
+        )
+
+    def test_retry_after(self):
+        statuses = [429, 503, 200]
+
+        def request(method, url, **kwargs):
+            response = requests.Response()
+            response.status_code = statuses.pop(0)
+            response.headers["Retry-After"] = "0.1"
+            response._content = b'{"id": 1}'
+            return response
+
+        metabase = Metabase(
+            url="http://localhost",
+            api_key="key",
+            username=None,
+            password=None,
+            session_id=None,
+            skip_verify=False,
+            cert=None,
+            http_timeout=1,
+            http_headers=None,
+            http_adapter=None,
+        )
+        start = time.monotonic()
+        with mock.patch.object(metabase.session, "request", side_effect=request):
+            self.assertEqual({"id": 1}, metabase.get_current_user())
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertEqual([], statuses)
+
+
+class TestAsyncMetabase(unittest.TestCase):
+    def setUp(self):
+        self.metabase = MockMetabase(url="http://localhost")
+
+    def test_run_all(self):
+        async_metabase = AsyncMetabase(self.metabase, concurrency=2)
+        self.addCleanup(async_metabase.close)
+
+        results = async_metabase.run_all(
+            async_metabase.find_database(name="unit_testing"),
+            async_metabase.find_database(name="foo"),
+            async_metabase.get_collections(exclude_personal=True),
+        )
+
+        assert results[0]
+        self.assertEqual(2, results[0]["id"])
+        self.assertIsNone(results[1])
+        self.assertEqual(3, len(results[2]))
+
+    def test_run_all_in_loop(self):
+        async_metabase = AsyncMetabase(self.metabase, concurrency=2)
+        self.addCleanup(async_metabase.close)
+
+        # Synchronous code called from a running loop, e.g. in Jupyter
+        async def main() -> list:
+            return async_metabase.run_all(
+                async_metabase.find_database(name="unit_testing"),
+                async_metabase.get_collections(exclude_personal=True),
+            )
+
+        database, collections = asyncio.run(main())
+        self.assertEqual(2, database["id"])
+        self.assertEqual(3, len(collections))
+
+    def test_concurrency(self):
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def find_card(uid: str) -> dict:
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+            return {"id": uid}
+
+        async_metabase = AsyncMetabase(self.metabase, concurrency=3)
+        self.addCleanup(async_metabase.close)
+
+        with mock.patch.object(self.metabase, "find_card", side_effect=find_card):
+            cards = async_metabase.run_all(
+                *(async_metabase.find_card(uid=str(i)) for i in range(12))
+            )
+
+        self.assertEqual([str(i) for i in range(12)], [c["id"] for c in cards])
+        self.assertEqual(3, peak)
@@ -1,6 +1,17 @@
+import asyncio
+import copy
+import dataclasses as dc
+import json
 import unittest
+from unittest import mock
 
-from ._mocks import MockDbtMetabase
+import requests
+
+from dbtmetabase.errors import MetabaseStateError
+from dbtmetabase.format import Filter
+from dbtmetabase.manifest import CatalogColumn
+
+from ._mocks import TMP_PATH, MockDbtMetabase
 
 
 class TestModels(unittest.TestCase):
@@ -17,6 +28,314 @@ class TestModels(unittest.TestCase):
             order_fields=True,
         )
 
+    def test_export_in_loop(self):
+        # Synchronous export called from a running loop, e.g. in Jupyter
+        async def main():
+            self.c.export_models(
+                metabase_database="unit_testing",
+                skip_sources=True,
+                sync_timeout=0,
+                workers=2,
+            )
+
+        asyncio.run(main())
+
+    def test_export_synced(self):
+        with mock.patch.object(
+            self.c.metabase, "sync_database_schema"
+        ) as sync_database_schema:
+            self.c.export_models(
+                metabase_database="unit_testing",
+                skip_sources=True,
+                sync_timeout=30,
+            )
+
+        sync_database_schema.assert_not_called()
+
+        with mock.patch.object(
+            self.c.metabase, "sync_database_schema"
+        ) as sync_database_schema:
+            self.c.export_models(
+                metabase_database="unit_testing",
+                skip_sources=True,
+                sync_timeout=30,
+                force_sync=True,
+            )
+
+        sync_database_schema.assert_called_once()
+
+    def test_export_sync_tables(self):
+        metadata = self.c.metabase.get_database_metadata(uid="2")
+        tables = {t["id"]: t for t in copy.deepcopy(metadata["tables"])}
+
+        # Only fields missing, tables are synced on their own
+        for table in metadata["tables"]:
+            if table["name"] == "orders":
+                table["fields"] = table["fields"][:1]
+
+        with mock.patch.object(
+            self.c.metabase, "get_database_metadata", return_value=metadata
+        ), mock.patch.object(
+            self.c.metabase, "sync_database_schema"
+        ) as sync_database_schema, mock.patch.object(
+            self.c.metabase, "sync_table_schema"
+        ) as sync_table_schema, mock.patch.object(
+            self.c.metabase,
+            "get_table_metadata",
+            side_effect=lambda uid: copy.deepcopy(tables[uid]),
+        ):
+            self.c.export_models(
+                metabase_database="unit_testing",
+                skip_sources=True,
+                sync_timeout=30,
+            )
+
+        sync_database_schema.assert_not_called()
+        sync_table_schema.assert_called_once()
+        self.assertEqual(
+            "orders", tables[sync_table_schema.call_args.kwargs["uid"]]["name"]
+        )
+
+    def test_export_sync_wait(self):
+        metadata = self.c.metabase.get_database_metadata(uid="2")
+        tables = {t["id"]: t for t in copy.deepcopy(metadata["tables"])}
+
+        # Orders not synced yet, customers without status field
+        unsynced = copy.deepcopy(metadata)
+        unsynced["tables"] = [t for t in unsynced["tables"] if t["name"] != "orders"]
+        for table in unsynced["tables"]:
+            if table["name"] == "customers":
+                table["fields"] = table["fields"][:1]
+
+        with mock.patch.object(
+            self.c.metabase, "get_database_metadata", return_value=unsynced
+        ) as get_database_metadata, mock.patch.object(
+            self.c.metabase, "sync_database_schema"
+        ) as sync_database_schema, mock.patch.object(
+            self.c.metabase,
+            "get_table_metadata",
+            side_effect=lambda uid: copy.deepcopy(tables[uid]),
+        ) as get_table_metadata:
+            self.c.export_models(
+                metabase_database="unit_testing",
+                model_filter=Filter(include=["orders", "customers"]),
+                skip_sources=True,
+                sync_timeout=30,
+            )
+
+        sync_database_schema.assert_called_once()
+        get_database_metadata.assert_called_once()
+        self.assertEqual(
+            {"orders", "customers"},
+            {tables[c.kwargs["uid"]]["name"] for c in get_table_metadata.mock_calls},
+        )
+
+    def test_export_sync_timeout(self):
+        metadata = self.c.metabase.get_database_metadata(uid="2")
+        metadata["tables"] = [t for t in metadata["tables"] if t["name"] != "orders"]
+
+        with mock.patch.object(
+            self.c.metabase, "get_database_metadata", return_value=metadata
+        ), mock.patch.object(
+            self.c.metabase, "get_tables", return_value=[]
+        ), mock.patch.object(
+            self.c.metabase, "sync_database_schema"
+        ):
+            with self.assertRaisesRegex(MetabaseStateError, "PUBLIC.ORDERS"):
+                self.c.export_models(
+                    metabase_database="unit_testing",
+                    skip_sources=True,
+                    sync_timeout=1,
+                )
+
+    def test_export_table_metadata(self):
+        # pylint: disable=protected-access
+        metadata = self.c.metabase.get_database_metadata(uid="2")
+        tables = {t["id"]: t for t in metadata["tables"]}
+
+        def export(selectivity: float) -> list:
+            self.c._ModelsMixin__TABLE_METADATA_SELECTIVITY = selectivity  # type: ignore
+            with mock.patch.object(
+                self.c.metabase,
+                "get_table_metadata",
+                side_effect=lambda uid: copy.deepcopy(tables[uid]),
+            ) as get_table_metadata, mock.patch.object(
+                self.c.metabase, "update_field"
+            ) as update_field:
+                self.c.export_models(
+                    metabase_database="unit_testing",
+                    model_filter=Filter(include=["orders"]),
+                    skip_sources=True,
+                )
+            return [get_table_metadata.mock_calls, update_field.mock_calls]
+
+        table_calls, updates = export(selectivity=1)
+        _, database_updates = export(selectivity=0)
+
+        # Orders and customers, its foreign key target
+        self.assertEqual(
+            {"orders", "customers"},
+            {tables[c.kwargs["uid"]]["name"] for c in table_calls},
+        )
+        self.assertTrue(updates)
+        self.assertCountEqual(database_updates, updates)
+
+    def test_export_catalog(self):
+        # pylint: disable=protected-access
+        table = self.c._ModelsMixin__get_tables(database_id="2")["PUBLIC.ORDERS"]  # type: ignore
+        field_names = [f["name"] for f in table["fields"].values()]
+
+        # Physical order from catalog differs from documented columns
+        catalog = {
+            "model.jaffle_shop.orders": [
+                CatalogColumn(name=name, index=i) for i, name in enumerate(field_names)
+            ]
+        }
+        with mock.patch.object(
+            self.c.manifest, "read_catalog", return_value=catalog
+        ), mock.patch.object(
+            self.c.metabase, "update_table_field_order"
+        ) as update_table_field_order:
+            self.c.export_models(
+                metabase_database="unit_testing",
+                model_filter=Filter(include=["orders"]),
+                skip_sources=True,
+                sync_timeout=0,
+                order_fields=True,
+                use_catalog=True,
+            )
+
+        update_table_field_order.assert_called_once_with(
+            uid=table["id"],
+            body=[f["id"] for f in table["fields"].values()],
+        )
+
+    def test_export_fingerprints(self):
+        # pylint: disable=protected-access
+        # Metadata of the whole database, even for a single table
+        self.c._ModelsMixin__TABLE_METADATA_SELECTIVITY = 0  # type: ignore
+
+        path = TMP_PATH / "fingerprints" / "fingerprints.json"
+        path.unlink(missing_ok=True)
+
+        models = self.c.manifest.read_models(skip_sources=True)
+
+        def export(**kwargs):
+            with mock.patch.object(
+                self.c.manifest, "read_models", return_value=models
+            ), mock.patch.object(
+                self.c,
+                "_ModelsMixin__fetch_tables",
+                wraps=self.c._ModelsMixin__fetch_tables,  # type: ignore
+            ) as fetch_tables, mock.patch.object(
+                self.c.metabase, "update_field"
+            ) as update_field:
+                self.c.export_models(
+                    metabase_database="unit_testing",
+                    sync_timeout=0,
+                    fingerprints_path=str(path),
+                    **kwargs,
+                )
+            return fetch_tables, update_field
+
+        fetch_tables, _ = export()
+        fetch_tables.assert_called_once()
+        self.assertTrue(path.exists())
+
+        # Nothing changed, nothing retrieved
+        fetch_tables, update_field = export()
+        fetch_tables.assert_not_called()
+        update_field.assert_not_called()
+
+        # Only the changed column is exported
+        orders = next(m for m in models if m.name == "orders")
+        orders.columns = [
+            dc.replace(c, description="Changed") if c.name == "status" else c
+            for c in orders.columns
+        ]
+        fetch_tables, update_field = export()
+        fetch_tables.assert_called_once()
+        update_field.assert_called_once()
+        self.assertEqual(
+            "Changed", update_field.call_args.kwargs["body"]["description"]
+        )
+
+        fetch_tables, _ = export()
+        fetch_tables.assert_not_called()
+
+        fetch_tables, _ = export(full_reconcile=True)
+        fetch_tables.assert_called_once()
+
+        fetch_tables, _ = export(reconcile_interval=0)
+        fetch_tables.assert_called_once()
+
+        # Reconciled by model, e.g. after runs with filters
+        fingerprints = json.loads(path.read_text())
+        (stored,) = fingerprints.values()
+        stored["models"]["model.jaffle_shop.orders"]["reconciled"] = 0
+        path.write_text(json.dumps(fingerprints))
+
+        fetch_tables, _ = export()
+        fetch_tables.assert_called_once()
+        self.assertEqual(["orders"], [m.name for m in fetch_tables.call_args.args[1]])
+
+        fetch_tables, _ = export()
+        fetch_tables.assert_not_called()
+
+    def test_export_workers(self):
+        calls = []
+
+        def update_field(uid: str, body: dict) -> dict:
+            calls.append((uid, body))
+            return {}
+
+        with mock.patch.object(
+            self.c.metabase, "update_field", side_effect=update_field
+        ):
+            self.c.export_models(
+                metabase_database="unit_testing",
+                skip_sources=True,
+                sync_timeout=0,
+                workers=4,
+            )
+
+        # Primary keys land before foreign keys pointing to them
+        pk_ids = [uid for uid, body in calls if body.get("semantic_type") == "type/PK"]
+        fk_calls = [i for i, (_, b) in enumerate(calls) if b.get("fk_target_field_id")]
+        self.assertTrue(pk_ids)
+        self.assertTrue(fk_calls)
+        self.assertLess(len(pk_ids) - 1, min(fk_calls))
+
+    def test_export_errors(self):
+        calls = []
+        failed_ids = set()
+
+        def update_field(uid: str, body: dict) -> dict:
+            calls.append(body)
+            if body.get("semantic_type") == "type/PK":
+                failed_ids.add(uid)
+                raise requests.exceptions.HTTPError("Failed")
+            return {}
+
+        with mock.patch.object(
+            self.c.metabase, "update_field", side_effect=update_field
+        ), mock.patch.object(self.c.metabase, "update_table") as update_table:
+            with self.assertRaises(MetabaseStateError):
+                self.c.export_models(
+                    metabase_database="unit_testing",
+                    skip_sources=True,
+                    sync_timeout=0,
+                    workers=4,
+                )
+
+        # Failures don't stop other updates, only foreign keys to failed targets
+        self.assertTrue(failed_ids)
+        self.assertTrue(update_table.called)
+        self.assertGreater(len(calls), len(failed_ids))
+        self.assertFalse(
+            [b for b in calls if b.get("fk_target_field_id") in failed_ids]
+        )
+
     def test_build_lookups(self):
         # pylint: disable=protected-access,no-member
         expected = {
@@ -54,3 +373,38 @@ class TestModels(unittest.TestCase):
 
         for table, columns in expected.items():
             self.assertEqual(columns, list(actual_tables[table]["fields"].keys()))
+
+    def test_build_lookups_selected(self):
+        # pylint: disable=protected-access,no-member
+        metadata = self.c.metabase.get_database_metadata(uid="2")
+        orders = next(t for t in metadata["tables"] if t["name"] == "orders")
+
+        with mock.patch.object(
+            self.c.metabase, "get_database_metadata", return_value=metadata
+        ):
+            actual_tables = self.c._ModelsMixin__get_tables(  # type: ignore
+                database_id="2",
+                table_keys={"PUBLIC.ORDERS"},
+            )
+
+        # Indexed in place, without copies
+        self.assertEqual(["PUBLIC.ORDERS"], list(actual_tables.keys()))
+        self.assertIs(orders, actual_tables["PUBLIC.ORDERS"])
+
+    def test_export_snapshot(self):
+        metadata = self.c.metabase.get_database_metadata(uid="2")
+        fields = [f for t in metadata["tables"] for f in t["fields"]]
+        descriptions = [f.get("description") for f in fields]
+
+        with mock.patch.object(
+            self.c.metabase, "get_database_metadata", return_value=metadata
+        ), mock.patch.object(self.c.metabase, "update_field") as update_field:
+            self.c.export_models(
+                metabase_database="unit_testing",
+                skip_sources=True,
+                sync_timeout=0,
+            )
+
+        # Changes are sent, retrieved fields are left as they were
+        self.assertTrue(update_field.called)
+        self.assertEqual(descriptions, [f.get("description") for f in fields])